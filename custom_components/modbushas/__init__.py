@@ -1,5 +1,6 @@
 """Modbus HAS integration."""
 import logging
+import time
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
@@ -8,95 +9,42 @@ from homeassistant.helpers import discovery
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "modbushas"
+# Czas startu integracji - punkt odniesienia dla czasu do pierwszego poprawnego stanu
+DATA_SETUP_STARTED = "setup_started"
+# Platformy ładowane z sekcji modbushas w configuration.yaml
+PLATFORMS = ("light", "binary_sensor", "sensor", "switch", "climate", "cover")
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Modbus HAS integration."""
     _LOGGER.info("Setting up Modbus HAS integration")
+    hass.data.setdefault(DOMAIN, {})[DATA_SETUP_STARTED] = time.monotonic()
     
-    # Load light platform if configured
-    if DOMAIN in config and "light" in config[DOMAIN]:
-        _LOGGER.info("Loading light platform from config")
-        
-        # Get the light configuration
-        light_config = config[DOMAIN]["light"]
-        _LOGGER.info("Light config: %s", light_config)
-        
-        # Sprawdź strukturę light_config po rozszerzeniu !include
-        if isinstance(light_config, dict) and "light" in light_config:
+    if DOMAIN not in config:
+        return True
+
+    for platform in PLATFORMS:
+        if platform not in config[DOMAIN]:
+            continue
+        _LOGGER.info("Loading %s platform from config", platform)
+
+        # Get the platform configuration
+        platform_entries = config[DOMAIN][platform]
+        _LOGGER.info("%s config: %s", platform, platform_entries)
+
+        # Sprawdź strukturę konfiguracji po rozszerzeniu !include
+        if isinstance(platform_entries, dict) and platform in platform_entries:
             # Struktura po rozszerzeniu !include: {'light': [platform1, platform2, platform3]}
-            platforms = light_config["light"]
-            if isinstance(platforms, list):
-                for platform_config in platforms:
-                    if platform_config.get("platform") == "modbushas":
-                        _LOGGER.info("Loading platform: %s", platform_config)
-                        discovery.load_platform(hass, "light", "modbushas", platform_config, config)
-            else:
-                _LOGGER.error("Expected list of platforms, got: %s", type(platforms))
-        elif isinstance(light_config, list):
-            # Struktura: [platform1, platform2, platform3] - bezpośrednia lista
-            for platform_config in light_config:
-                if platform_config.get("platform") == "modbushas":
-                    _LOGGER.info("Loading platform: %s", platform_config)
-                    discovery.load_platform(hass, "light", "modbushas", platform_config, config)
-        else:
-            _LOGGER.error("Unexpected light_config structure: %s", type(light_config))
-    
-    # Load binary_sensor platform if configured
-    if DOMAIN in config and "binary_sensor" in config[DOMAIN]:
-        _LOGGER.info("Loading binary_sensor platform from config")
-        
-        # Get the binary_sensor configuration
-        binary_sensor_config = config[DOMAIN]["binary_sensor"]
-        _LOGGER.info("Binary sensor config: %s", binary_sensor_config)
-        
-        # Sprawdź strukturę binary_sensor_config po rozszerzeniu !include
-        if isinstance(binary_sensor_config, dict) and "binary_sensor" in binary_sensor_config:
-            # Struktura po rozszerzeniu !include: {'binary_sensor': [platform1, platform2, platform3]}
-            platforms = binary_sensor_config["binary_sensor"]
-            if isinstance(platforms, list):
-                for platform_config in platforms:
-                    if platform_config.get("platform") == "modbushas":
-                        _LOGGER.info("Loading binary_sensor platform: %s", platform_config)
-                        discovery.load_platform(hass, "binary_sensor", "modbushas", platform_config, config)
-            else:
-                _LOGGER.error("Expected list of platforms, got: %s", type(platforms))
-        elif isinstance(binary_sensor_config, list):
-            # Struktura: [platform1, platform2, platform3] - bezpośrednia lista
-            for platform_config in binary_sensor_config:
-                if platform_config.get("platform") == "modbushas":
-                    _LOGGER.info("Loading binary_sensor platform: %s", platform_config)
-                    discovery.load_platform(hass, "binary_sensor", "modbushas", platform_config, config)
-        else:
-            _LOGGER.error("Unexpected binary_sensor_config structure: %s", type(binary_sensor_config))
-    
-    # Load sensor platform if configured
-    if DOMAIN in config and "sensor" in config[DOMAIN]:
-        _LOGGER.info("Loading sensor platform from config")
-        
-        # Get the sensor configuration
-        sensor_config = config[DOMAIN]["sensor"]
-        _LOGGER.info("Sensor config: %s", sensor_config)
-        
-        # Sprawdź strukturę sensor_config po rozszerzeniu !include
-        if isinstance(sensor_config, dict) and "sensor" in sensor_config:
-            # Struktura po rozszerzeniu !include: {'sensor': [platform1, platform2, platform3]}
-            platforms = sensor_config["sensor"]
-            if isinstance(platforms, list):
-                for platform_config in platforms:
-                    if platform_config.get("platform") == "modbushas":
-                        _LOGGER.info("Loading sensor platform: %s", platform_config)
-                        discovery.load_platform(hass, "sensor", "modbushas", platform_config, config)
-            else:
-                _LOGGER.error("Expected list of platforms, got: %s", type(platforms))
-        elif isinstance(sensor_config, list):
-            # Struktura: [platform1, platform2, platform3] - bezpośrednia lista
-            for platform_config in sensor_config:
-                if platform_config.get("platform") == "modbushas":
-                    _LOGGER.info("Loading sensor platform: %s", platform_config)
-                    discovery.load_platform(hass, "sensor", "modbushas", platform_config, config)
-        else:
-            _LOGGER.error("Unexpected sensor_config structure: %s", type(sensor_config))
-    
+            platform_entries = platform_entries[platform]
+        if not isinstance(platform_entries, list):
+            _LOGGER.error("Unexpected %s config structure: %s", platform, type(platform_entries))
+            continue
+
+        # Struktura: [platform1, platform2, platform3] - bezpośrednia lista
+        for platform_config in platform_entries:
+            if platform_config.get("platform") == DOMAIN:
+                _LOGGER.info("Loading %s platform: %s", platform, platform_config)
+                discovery.load_platform(hass, platform, DOMAIN, platform_config, config)
+
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
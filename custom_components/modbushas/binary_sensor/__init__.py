@@ -1,4 +1,4 @@
 """The modbushas binary_sensor integration."""
-from .binary_sensor import setup_platform
+from .binary_sensor import async_setup_platform
 
-__all__ = ["setup_platform"]
+__all__ = ["async_setup_platform"]
@@ -0,0 +1,103 @@
+"""
+Per-hub circuit breaker for Modbus HAS requests.
+
+Po kilku kolejnych błędach zapytań bezpiecznik się otwiera: zapytania do huba
+kończą się od razu błędem HubUnavailableError, bez ruchu w sieci. Po czasie
+oczekiwania (rosnącym wykładniczo, z losowym rozrzutem) bezpiecznik przechodzi
+w stan półotwarty i przepuszcza jedno zapytanie próbne - sukces zamyka
+bezpiecznik, błąd otwiera go ponownie na dłużej.
+"""
+import random
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Liczba kolejnych błędów, po której bezpiecznik się otwiera
+DEFAULT_FAILURE_THRESHOLD = 3
+# Pierwszy i największy czas oczekiwania (w sekundach) przed zapytaniem próbnym
+DEFAULT_BACKOFF = 2
+DEFAULT_MAX_BACKOFF = 300
+# Względny rozrzut czasu oczekiwania (0.2 - +/- 20%)
+DEFAULT_JITTER = 0.2
+
+
+class HubUnavailableError(Exception):
+    """Raised for requests rejected by an open circuit breaker."""
+
+
+class CircuitBreaker():
+    """Closed / open / half-open breaker with exponential backoff and jitter."""
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, backoff=DEFAULT_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF, jitter=DEFAULT_JITTER):
+        self._failure_threshold = failure_threshold
+        self._base_backoff = backoff
+        self._max_backoff = max_backoff
+        self._jitter = jitter
+        self.state = STATE_CLOSED
+        # Kolejne błędy od ostatniego sukcesu
+        self.failures = 0
+        self.last_error = None
+        # Czas (time.monotonic) pierwszego błędu serii i zapytania próbnego
+        self.failing_since = None
+        self.retry_at = None
+        self._backoff = backoff
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def closed(self):
+        """Return True if requests pass normally."""
+        return self.state == STATE_CLOSED
+
+    def is_open(self, now):
+        """Return True if requests are rejected at `now` (backoff not elapsed)."""
+        return self.state == STATE_OPEN and now < self.retry_at
+
+    def allow(self, now):
+        """
+        Sprawdza, czy zapytanie może iść do huba.
+
+        Po upływie czasu oczekiwania otwarty bezpiecznik przechodzi w stan
+        półotwarty i przepuszcza zapytanie próbne.
+        """
+        if self.state != STATE_OPEN:
+            return True
+        if now < self.retry_at:
+            self.rejected += 1
+            return False
+        self.state = STATE_HALF_OPEN
+        return True
+
+    def record_success(self, now):
+        """Zapisuje udane zapytanie - zamyka bezpiecznik."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.failing_since = None
+        self.retry_at = None
+        self._backoff = self._base_backoff
+
+    def record_failure(self, error, now):
+        """Zapisuje błąd zapytania - otwiera bezpiecznik po przekroczeniu progu."""
+        self.failures += 1
+        self.last_error = error
+        if self.failing_since is None:
+            self.failing_since = now
+        if self.state == STATE_HALF_OPEN:
+            # Zapytanie próbne nieudane - czekamy dwa razy dłużej
+            self._backoff = min(self._backoff * 2, self._max_backoff)
+            self._open(now)
+        elif self.state == STATE_CLOSED and self.failures >= self._failure_threshold:
+            self.trips += 1
+            self._open(now)
+
+    def _open(self, now):
+        self.state = STATE_OPEN
+        delay = self._backoff * (1 + random.uniform(-self._jitter, self._jitter))
+        self.retry_at = now + delay
+
+    @property
+    def retry_in(self):
+        """Return the backoff (in seconds) chosen at the last opening."""
+        return self._backoff
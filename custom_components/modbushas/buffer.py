@@ -0,0 +1,1526 @@
+"""
+Shared coil and register buffers for Modbus HAS platforms.
+
+Bufory odczytują skonfigurowane adresy blokami zaplanowanymi przez planner.py.
+Wynik każdego bloku trzymany jest jako zwarty obraz procesu (process image):
+bytearray dla coilów i array('H') dla rejestrów; encje czytają z niego po offsecie.
+Odpytywaniem steruje koordynator huba (coordinator.py); po każdym odczycie
+bufor powiadamia zarejestrowane encje.
+"""
+import logging
+import datetime
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from array import array
+from functools import partial
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from homeassistant.components.modbus.const import (
+    MODBUS_DOMAIN,
+    CALL_TYPE_COIL,
+    CALL_TYPE_WRITE_COIL,
+    CALL_TYPE_WRITE_COILS,
+    CALL_TYPE_REGISTER_HOLDING,
+    CALL_TYPE_REGISTER_INPUT,
+    CALL_TYPE_WRITE_REGISTER,
+    CALL_TYPE_WRITE_REGISTERS,
+)
+
+from . import DOMAIN, DATA_SETUP_STARTED
+from .breaker import HubUnavailableError
+from .coordinator import (
+    async_get_coordinator,
+    PRIORITY_COMMAND,
+    PRIORITY_REFRESH,
+    PRIORITY_POLL,
+)
+from .decoder import block_views
+from .snapshot import async_get_snapshot
+from .planner import (
+    plan_blocks,
+    group_contiguous,
+    MAX_COILS_PER_READ,
+    MAX_COILS_PER_WRITE,
+    MAX_REGISTERS_PER_READ,
+    MAX_REGISTERS_PER_WRITE,
+    DEFAULT_COIL_MAX_GAP,
+    DEFAULT_REGISTER_MAX_GAP,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SCAN_INTERVAL = datetime.timedelta(seconds=30)
+# Okno (w sekundach), w którym zapisy są zbierane do jednego FC15 / FC16
+DEFAULT_WRITE_WINDOW = 0.05
+# Opóźnienie (w sekundach) zbiorczej weryfikacji zapisanych coilów
+DEFAULT_VERIFY_DELAY = 0.1
+# Mnożnik interwału adaptacyjnego bloku po każdym odczycie bez zmian
+ADAPTIVE_BACKOFF = 2
+# Liczba kolejnych nieudanych odczytów, po której blok (i jego encje) jest niedostępny
+BLOCK_FAILURE_THRESHOLD = 3
+# Wartości starsze niż tyle interwałów bloku oznaczane są jako nieaktualne (stale)
+STALE_AGE_FACTOR = 3
+
+DATA_BUFFERS = "buffers"
+
+
+def changed_offsets(old, new, width=1):
+    """
+    Zwraca offsety elementów, które różnią się między dwoma obrazami.
+
+    Obrazy porównujemy jako liczby całkowite (XOR), więc pętla w Pythonie
+    wykonuje się tylko tyle razy, ile elementów faktycznie się zmieniło.
+    """
+    if old == new:
+        return []
+    diff = int.from_bytes(old, "little") ^ int.from_bytes(new, "little")
+    bits = 8 * width
+    offsets = []
+    base = 0
+    while diff:
+        index = ((diff & -diff).bit_length() - 1) // bits
+        offsets.append(base + index)
+        diff >>= (index + 1) * bits
+        base += index + 1
+    return offsets
+
+
+@callback
+def async_get_buffer(hass, buffer_class, hub_name, slave, scan_interval, **options):
+    """
+    Zwraca wspólny bufor dla (hub, slave, tabela); tworzy go przy pierwszym użyciu.
+
+    Wszystkie platformy i wpisy konfiguracji korzystające z tej samej tabeli
+    tego samego urządzenia dzielą jeden bufor, więc nakładające się adresy
+    są odczytywane raz. Bufor odpytywany jest z najkrótszym zgłoszonym interwałem.
+    """
+    buffers = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_BUFFERS, {})
+    key = (hub_name, slave, buffer_class.TABLE)
+    buffer = buffers.get(key)
+    if buffer is None:
+        name = "{}/{}/{}".format(hub_name, slave, buffer_class.TABLE)
+        buffer = buffer_class(name, hass, hub_name, slave, scan_interval, **options)
+        buffers[key] = buffer
+        _LOGGER.debug("Created shared buffer %s", name)
+    else:
+        buffer.async_merge_options(scan_interval, **options)
+    return buffer
+
+
+async def async_prime_buffers(hass, buffers, platform):
+    """
+    Odczytuje blokowo wszystkie bufory platformy przed dodaniem encji.
+
+    Wszystkie bufory czytane są równolegle; bloki już świeże (np. wspólny
+    bufor zainicjowany przez inną platformę) są pomijane. Encje tworzone
+    są potem ze stanem z obrazu procesu, bez pojedynczych odczytów.
+    Przed odczytem bufory dostają wartości z migawki poprzedniego
+    uruchomienia - jeśli PLC nie odpowie, encje startują z nimi (stale).
+    Zwraca czas primingu w sekundach.
+    """
+    buffers = list(dict.fromkeys(buffers))
+    started = time.monotonic()
+    snapshot = await async_get_snapshot(hass)
+    for buffer in buffers:
+        snapshot.async_restore(buffer)
+    results = await asyncio.gather(*(buffer.async_refresh(1) for buffer in buffers))
+    # Encje innych platform słuchające już wspólnego bufora dostają stan z primingu
+    # od razu, nie dopiero w najbliższym cyklu odpytywania
+    for buffer in buffers:
+        if buffer.has_listeners:
+            buffer.async_dispatch_changes()
+    finished = time.monotonic()
+    setup_started = hass.data.get(DOMAIN, {}).get(DATA_SETUP_STARTED)
+    _LOGGER.info("%s: primed %d buffers in %.3f s (%d refreshed), first correct state %.3f s after setup",
+                 platform, len(buffers), finished - started, sum(1 for result in results if result),
+                 finished - (setup_started if setup_started is not None else started))
+    return finished - started
+
+
+def scan_interval_to_timedelta(scan_interval):
+    """Konwertuje scan_interval z konfiguracji na timedelta."""
+    if isinstance(scan_interval, (int, float)):
+        return datetime.timedelta(seconds=scan_interval)
+    if scan_interval is None:
+        return DEFAULT_BUFFER_SCAN_INTERVAL
+    return scan_interval
+
+
+class ModbusBlock():
+    """One planned block read of `count` addresses starting at `start`."""
+
+    def __init__(self, start, count, image, interval=None, min_interval=None):
+        self.start = start
+        self.count = count
+        # Interwał odpytywania bloku - najkrótszy wśród adresów bloku
+        self.interval = interval
+        # Odpytywanie adaptacyjne: bieżący interwał spada do min_interval po
+        # zmianie lub poleceniu i rośnie z powrotem do interval, gdy blok milczy
+        self.min_interval = min_interval if interval and min_interval and min_interval < interval else None
+        self.poll_interval = interval
+        # Obraz procesu bloku - ostatnio odczytane wartości, indeksowane offsetem
+        self.image = image
+        # False dopóki blok nie został odczytany (lub po unieważnieniu)
+        self.valid = False
+        # Trwający odczyt bloku - współdzielony przez wszystkich pytających
+        self.pending = None
+        # Zapytanie odczytu w kolejce huba (do podniesienia priorytetu)
+        self.request = None
+        # Czas (time.monotonic) ostatniego udanego odczytu i jego numer kolejny
+        self.last_read = None
+        self.generation = 0
+        # Kolejne nieudane odczyty od ostatniego sukcesu
+        self.failures = 0
+        # Dekodery wartości zaczynających się w bloku (tylko bloki rejestrów)
+        self.decoders = []
+
+    @property
+    def end(self):
+        """Return the last address covered by the block."""
+        return self.start + self.count - 1
+
+    @property
+    def tick(self):
+        """Return the coordinator timer interval that drives this block."""
+        return self.min_interval or self.interval
+
+    @property
+    def max_age(self):
+        """Return how long (in seconds) a read of this block stays valid."""
+        return self.poll_interval.total_seconds() if self.poll_interval else 0
+
+    def due(self, age_factor, now=None):
+        """
+        Return True if the poll tick should read the block.
+
+        Blok czytany jest w pierwszym takcie, w którym jego wiek przekroczy
+        bieżący interwał pomniejszony o (1 - age_factor) taktu - dla bloku
+        bez adaptacji to age_factor * interwał.
+        """
+        tick = self.tick.total_seconds() if self.tick else 0
+        return self.expired(self.max_age - tick * (1 - age_factor), now)
+
+    def speed_up(self):
+        """Drop the adaptive interval to its minimum; return True if it changed."""
+        if self.min_interval is None or self.poll_interval == self.min_interval:
+            return False
+        self.poll_interval = self.min_interval
+        return True
+
+    def slow_down(self):
+        """Back the adaptive interval off towards the configured one; return True if it changed."""
+        if self.min_interval is None or self.poll_interval == self.interval:
+            return False
+        self.poll_interval = min(self.poll_interval * ADAPTIVE_BACKOFF, self.interval)
+        return True
+
+    def age(self, now=None):
+        """Return seconds since the last successful read (None if never read)."""
+        if not self.valid or self.last_read is None:
+            return None
+        return (time.monotonic() if now is None else now) - self.last_read
+
+    @property
+    def stale(self):
+        """Return True if the image comes from a snapshot or is several intervals old."""
+        if not self.valid:
+            return False
+        if self.last_read is None:
+            return True
+        return self.interval is not None and self.age() > STALE_AGE_FACTOR * self.interval.total_seconds()
+
+    @property
+    def available(self):
+        """Return True if the block holds data and its reads are not failing."""
+        return self.valid and self.failures < BLOCK_FAILURE_THRESHOLD
+
+    def expired(self, max_age, now=None):
+        """Return True if the block has to be read again."""
+        age = self.age(now)
+        return age is None or age >= max_age
+
+    def __contains__(self, address):
+        return self.start <= address <= self.end
+
+    def __repr__(self):
+        if self.min_interval is not None:
+            return "ModbusBlock({}-{} every {}..{}, now {})".format(
+                self.start, self.end, self.min_interval, self.interval, self.poll_interval)
+        return "ModbusBlock({}-{} every {})".format(self.start, self.end, self.interval)
+
+
+class ModbusBuffer(ABC):
+    """Common part of the coil and register buffers."""
+
+    # Ustawiane przez klasy pochodne
+    TABLE = None
+    READ_CALL_TYPE = None
+    MAX_COUNT = None
+    DEFAULT_MAX_GAP = 0
+
+    def __init__(self, name, hass, hub_name, slave, scan_interval, max_gap=None, min_interval=None):
+        self._hass = hass
+        self._name = name
+        self._hub_name = hub_name
+        self._slave = slave
+        self._scan_interval = scan_interval
+        self._max_gap = self.DEFAULT_MAX_GAP if max_gap is None else max_gap
+        # Dolna granica odpytywania adaptacyjnego (None - stałe interwały)
+        self._min_interval = scan_interval_to_timedelta(min_interval) if min_interval else None
+        # Termin (time.monotonic) zaplanowanego wysłania zapisów z okna
+        self._write_flush_at = None
+        self._doread = True
+        self._lastread = datetime.datetime.now()
+        # adres -> liczba adresów wartości (count > 1 dla wartości wielorejestrowych)
+        self._spans = {}
+        # adres -> najkrótszy interwał, którego wymaga któraś z encji
+        self._span_intervals = {}
+        self._blocks = []
+        # adres -> blok, który go odczytuje
+        self._block_index = {}
+        self._replan = True
+        self._hub = None
+        self._coalesced_reads = 0
+        self._coordinator = async_get_coordinator(hass, hub_name)
+        # interwał -> funkcja odłączająca bufor od timera koordynatora
+        self._poll_registrations = {}
+        self._listeners = []
+        # adres -> lista callbacków encji, które z niego korzystają
+        self._address_listeners = {}
+        # adresy zmienione od ostatniego rozesłania
+        self._changed = set()
+
+    @property
+    def scan_interval(self):
+        """Return the poll interval of this buffer."""
+        return self._scan_interval
+
+    @property
+    def name(self):
+        """Return the name of this buffer."""
+        return self._name
+
+    @property
+    def has_listeners(self):
+        """Return True if entities are subscribed to this buffer."""
+        return bool(self._listeners)
+
+    @property
+    def available(self):
+        """Return False while the hub circuit breaker rejects requests."""
+        return self._coordinator.available
+
+    @property
+    def max_age(self):
+        """Return how long (in seconds) a read of addresses without own interval stays valid."""
+        return self._scan_interval.total_seconds() if self._scan_interval else 0
+
+    @callback
+    def async_merge_options(self, scan_interval, max_gap=None, min_interval=None):
+        """
+        Łączy ustawienia kolejnego wpisu konfiguracji korzystającego z bufora.
+
+        Najkrótszy interwał staje się domyślnym dla adresów bez własnego
+        interwału. Większy `max_gap` tylko łączy więcej bloków. Obowiązuje
+        najkrótszy `min_interval` odpytywania adaptacyjnego. Okno zapisu
+        nie jest ustawieniem bufora - podaje je każdy zapis (async_write_*).
+        """
+        if scan_interval and (not self._scan_interval or scan_interval < self._scan_interval):
+            _LOGGER.debug("%s: scan interval %s -> %s", self._name, self._scan_interval, scan_interval)
+            self._scan_interval = scan_interval
+            self._replan = True
+        if max_gap is not None and max_gap > self._max_gap:
+            self._max_gap = max_gap
+            self._replan = True
+        if min_interval:
+            min_interval = scan_interval_to_timedelta(min_interval)
+        if min_interval and (not self._min_interval or min_interval < self._min_interval):
+            self._min_interval = min_interval
+            self._replan = True
+        if self._replan and self._listeners:
+            self.get_blocks()
+
+    @callback
+    def _async_arm_write_flush(self, write_window=None):
+        """
+        Planuje wysłanie zebranych zapisów po oknie zapisu tego zapisu.
+
+        Okno należy do zapisującego (platformy lub usługi): zapis z krótszym
+        oknem przyspiesza wysyłkę już zebranych zapisów, dłuższe okno nie
+        opóźnia zapisów, które czekają krócej.
+        """
+        window = DEFAULT_WRITE_WINDOW if write_window is None else write_window
+        flush_at = time.monotonic() + window
+        if self._cancel_write_flush is not None:
+            if flush_at >= self._write_flush_at:
+                return
+            self._cancel_write_flush()
+        self._write_flush_at = flush_at
+        self._cancel_write_flush = async_call_later(self._hass, window, self._async_schedule_write_flush)
+
+    def _span_interval(self, address):
+        """Zwraca interwał odpytywania adresu (własny encji lub domyślny bufora)."""
+        return self._span_intervals.get(address) or self._scan_interval or DEFAULT_BUFFER_SCAN_INTERVAL
+
+    @callback
+    def _async_update_poll_registrations(self):
+        """Rejestruje bufor w koordynatorze dla każdego taktu jego bloków."""
+        intervals = {block.tick for block in self._blocks} if self._listeners else set()
+        for interval in list(self._poll_registrations):
+            if interval not in intervals:
+                self._poll_registrations.pop(interval)()
+        for interval in intervals:
+            if interval not in self._poll_registrations:
+                self._poll_registrations[interval] = self._coordinator.async_add_buffer(self, interval)
+
+    def is_stale(self, address):
+        """Sprawdza czy wartość pod adresem pochodzi z migawki lub nie była dawno odświeżona."""
+        block = self.get_block(address)
+        return block is not None and block.stale
+
+    def is_available(self, address):
+        """Sprawdza czy hub i blok adresu są dostępne (blok ma dane i nie zawodzi)."""
+        block = self.get_block(address)
+        return block is not None and block.available and self.available
+
+    def get_snapshot(self):
+        """Zwraca odczytane bloki jako listę [start, wartości] do zapisania."""
+        return [[block.start, list(block.image)] for block in self.get_blocks() if block.valid]
+
+    def restore_snapshot(self, saved):
+        """
+        Wpisuje wartości z migawki do jeszcze nieodczytanych bloków.
+
+        Blok przywracamy tylko, gdy migawka pokrywa go w całości - inaczej
+        część adresów miałaby wartości zmyślone. Zwraca liczbę przywróconych bloków.
+        """
+        values = {}
+        for start, block_values in saved:
+            for offset, value in enumerate(block_values):
+                values[start + offset] = value
+        restored = 0
+        for block in self.get_blocks():
+            if block.valid:
+                continue
+            try:
+                image = [values[address] for address in range(block.start, block.end + 1)]
+            except KeyError:
+                continue
+            for offset, value in enumerate(image):
+                block.image[offset] = value
+            block.valid = True
+            block.last_read = None
+            self._decode_block(block)
+            restored += 1
+        return restored
+
+    def get_value_age(self, address):
+        """Zwraca wiek (w sekundach) wartości pod adresem; None jeśli nie odczytana."""
+        block = self.get_block(address)
+        if block is None:
+            return None
+        return block.age()
+
+    def checkhub(self):
+        if(self._hub is None):
+            try:
+                if(MODBUS_DOMAIN in self._hass.data):
+                    self._hub = self._hass.data[MODBUS_DOMAIN][self._hub_name]
+                    _LOGGER.debug("Hub found: %s (name: %s)", self._hub, self._hub_name)
+                    _LOGGER.debug("Hub methods: %s", [method for method in dir(self._hub) if not method.startswith('_')])
+                else:
+                    # Zniknięcie i powrót huba loguje bezpiecznik koordynatora
+                    _LOGGER.debug("MODBUS_DOMAIN not found in hass.data")
+            except AttributeError as error:
+                _LOGGER.error("Error accessing hub: %s", error)
+                self._hub = None
+            except KeyError as error:
+                _LOGGER.debug("Hub '%s' not found in MODBUS_DOMAIN", self._hub_name)
+                self._hub = None
+
+    def _add_span(self, address, count=1, interval=None):
+        """Rejestruje adres (długość wartości i interwał) do planowania odczytów."""
+        changed = False
+        if self._spans.get(address, 0) < count:
+            self._spans[address] = count
+            changed = True
+        if interval is not None:
+            current = self._span_intervals.get(address)
+            if current is None or interval < current:
+                self._span_intervals[address] = interval
+                changed = True
+        if changed:
+            self._doread = True
+            self._replan = True
+
+    @abstractmethod
+    def _new_image(self, count):
+        """Tworzy pusty obraz procesu dla bloku o `count` adresach."""
+
+    def get_blocks(self):
+        """Zwraca bloki odczytu, planując je ponownie po zmianie adresów."""
+        if self._replan:
+            old_blocks = self._blocks
+            # Adresy grupujemy według interwału; każda grupa ma własny plan bloków.
+            # Adres potrzebny kilku encjom trafia do grupy najszybszej z nich,
+            # a wolniejsze encje korzystają z tych samych odczytów.
+            groups = {}
+            for address, count in self._spans.items():
+                groups.setdefault(self._span_interval(address), []).append((address, count))
+            self._blocks = []
+            self._block_index = {}
+            # Grupy planujemy od najszybszej. Zakres leżący w bloku szybszej grupy
+            # nie dostaje własnego odczytu; blok wolniejszej grupy może wypełnić
+            # dziurę adresami szybszego bloku, jeśli dziura mieści się w max_gap
+            # (tańsze niż osobne zapytanie), ale adresy te zostają przy szybszym
+            for interval in sorted(groups):
+                spans = []
+                for address, count in groups[interval]:
+                    faster = next((block for block in self._blocks
+                                   if block.start <= address and address + count - 1 <= block.end), None)
+                    if faster is None:
+                        spans.append((address, count))
+                        continue
+                    # Adres w dziurze bloku szybszej grupy - czytany jest razem z nim
+                    for offset in range(count):
+                        self._block_index[address + offset] = faster
+                blocks = [
+                    ModbusBlock(start, count, self._new_image(count), interval, self._min_interval)
+                    for start, count in plan_blocks(spans, self.MAX_COUNT, self._max_gap)
+                ]
+                for address, count in spans:
+                    for block in blocks:
+                        if address in block:
+                            for offset in range(count):
+                                # Adres czytany już przez blok szybszej grupy zostaje przy nim
+                                self._block_index.setdefault(address + offset, block)
+                            break
+                self._blocks.extend(blocks)
+            self._blocks.sort(key=lambda block: block.start)
+            # Przenosimy już odczytane dane do nowych bloków, jeśli stary blok je pokrywa
+            for block in self._blocks:
+                for old in old_blocks:
+                    if old.valid and old.start <= block.start and block.end <= old.end:
+                        offset = block.start - old.start
+                        block.image[:] = old.image[offset:offset + block.count]
+                        block.valid = True
+                        block.last_read = old.last_read
+                        block.generation = old.generation
+                        if block.min_interval is not None and old.poll_interval:
+                            block.poll_interval = max(block.min_interval, min(old.poll_interval, block.interval))
+                        break
+            self._replan = False
+            _LOGGER.debug("%s %s: planned blocks %s", type(self).__name__, self._name, self._blocks)
+            self._async_update_poll_registrations()
+        return self._blocks
+
+    def get_block(self, address):
+        """Zwraca blok odczytujący dany adres (None jeśli adres nie jest skonfigurowany)."""
+        if self._replan:
+            self.get_blocks()
+        return self._block_index.get(address)
+
+    def get_value_block(self, address, count=1):
+        """
+        Zwraca blok odczytujący całą wartość `count` adresów od `address`.
+
+        Wartość wielorejestrowa, która tylko częściowo leży w bloku szybszej
+        grupy, czytana jest w całości przez blok wolniejszej grupy.
+        """
+        block = self.get_block(address)
+        if block is None or address + count - 1 <= block.end:
+            return block
+        return next((candidate for candidate in self._blocks
+                     if candidate.start <= address and address + count - 1 <= candidate.end), None)
+
+    def invalidate(self, address=None):
+        """Unieważnia blok zawierający adres (lub wszystkie bloki)."""
+        if address is None:
+            for block in self.get_blocks():
+                block.valid = False
+            return
+        block = self.get_block(address)
+        if block is not None:
+            block.valid = False
+
+    @callback
+    def async_add_availability_listener(self, update_callback):
+        """
+        Rejestruje encję bez adresów w buforze na zmiany dostępności huba.
+
+        Taka encja (np. switch bez rejestru stanu) nie dostaje rozesłań
+        zmian, a bufor bez bloków nie jest odpytywany - o bezpieczniku
+        informuje ją bezpośrednio koordynator.
+        """
+        return self._coordinator.async_add_availability_listener(update_callback)
+
+    @callback
+    def async_add_listener(self, update_callback, addresses=None):
+        """
+        Rejestruje encję; pierwszy słuchacz dołącza bufor do koordynatora.
+
+        Encja podająca `addresses` jest powiadamiana tylko wtedy, gdy zmieni się
+        któryś z jej adresów; bez `addresses` - po każdej zmianie w buforze.
+        """
+        self._listeners.append(update_callback)
+        addresses = list(addresses) if addresses is not None else [None]
+        for address in addresses:
+            self._address_listeners.setdefault(address, []).append(update_callback)
+        if len(self._listeners) == 1:
+            # Pierwszy słuchacz - bufor dołącza do timerów koordynatora
+            self.get_blocks()
+            self._async_update_poll_registrations()
+
+        @callback
+        def remove_listener():
+            if update_callback in self._listeners:
+                self._listeners.remove(update_callback)
+            for address in addresses:
+                callbacks = self._address_listeners.get(address, [])
+                if update_callback in callbacks:
+                    callbacks.remove(update_callback)
+                if not callbacks:
+                    self._address_listeners.pop(address, None)
+            if not self._listeners:
+                self._async_update_poll_registrations()
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self):
+        """Powiadamia wszystkie zarejestrowane encje o nowych danych."""
+        self._changed.clear()
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _mark_changed(self, block, offsets=None):
+        """Zapamiętuje zmienione adresy bloku (wszystkie, gdy offsets is None)."""
+        if offsets is None:
+            self._changed.update(range(block.start, block.end + 1))
+        else:
+            start = block.start
+            self._changed.update(start + offset for offset in offsets)
+
+    @callback
+    def async_dispatch_changes(self):
+        """Powiadamia tylko encje przypisane do zmienionych adresów."""
+        if not self._changed:
+            return
+        changed = self._changed
+        self._changed = set()
+        # dict zachowuje kolejność i usuwa duplikaty (encja z kilkoma adresami)
+        callbacks = dict.fromkeys(self._address_listeners.get(None, ()))
+        for address in changed:
+            for update_callback in self._address_listeners.get(address, ()):
+                callbacks[update_callback] = None
+        _LOGGER.debug("%s: %d addresses changed, notifying %d entities",
+                      self._name, len(changed), len(callbacks))
+        for update_callback in callbacks:
+            update_callback()
+
+    @abstractmethod
+    def _store_block(self, block, result):
+        """Zapisuje wynik odczytu bloku w cache; zwraca True, jeśli obraz się zmienił."""
+
+    def note_activity(self, address):
+        """
+        Przyspiesza odpytywanie bloku adresu (np. po poleceniu użytkownika).
+
+        Blok wraca do min_interval i zwalnia dopiero po kolejnych odczytach bez zmian.
+        """
+        block = self.get_block(address)
+        if block is not None and block.speed_up():
+            _LOGGER.debug("%s: activity at %s, polling %s", self._name, address, block)
+
+    def _decode_block(self, block, sample=False):
+        """Dekoduje wartości bloku po zmianie obrazu (tylko bufory rejestrów)."""
+
+    async def _async_hub_call(self, priority, address, value, use_call):
+        """Wysyła zapytanie do huba przez kolejkę priorytetową koordynatora."""
+        return await self._coordinator.async_call(priority, partial(
+            self._async_pb_call, unit=self._slave, address=address, value=value, use_call=use_call))
+
+    async def _async_pb_call(self, **kwargs):
+        """
+        Wykonuje zapytanie na hubie wyszukanym w chwili wysłania.
+
+        Brak huba jest błędem zapytania jak każdy inny - zbiera go bezpiecznik
+        koordynatora (jedna linia logu przy zniknięciu i jedna przy powrocie
+        huba), zamiast błędu przy każdym bloku w każdym cyklu.
+        """
+        self.checkhub()
+        if self._hub is None:
+            raise HubUnavailableError("hub {} not found".format(self._hub_name))
+        return await self._hub.async_pb_call(**kwargs)
+
+    async def _async_read_block(self, block, priority=PRIORITY_POLL):
+        """
+        Odczytuje jeden zaplanowany blok; zwraca True przy sukcesie.
+
+        Jeśli odczyt tego bloku już trwa, czekamy na jego wynik zamiast
+        wysyłać drugie zapytanie - jeden round-trip na blok na cykl.
+        Pilniejszy pytający podnosi priorytet czekającego odczytu.
+        """
+        if block.pending is None:
+            # Zapytanie trafia do kolejki od razu - dołączający mogą podnieść jego priorytet
+            block.request = self._coordinator.async_queue_request(priority, partial(
+                self._async_pb_call,
+                unit=self._slave,
+                address=block.start,
+                value=block.count,
+                use_call=self.READ_CALL_TYPE
+            ))
+            block.pending = self._hass.async_create_task(self._async_do_read_block(block, block.request))
+            block.pending.add_done_callback(lambda task: self._clear_pending(block, task))
+        else:
+            self._coalesced_reads += 1
+            _LOGGER.debug("Joining in-flight read of %s", block)
+            if block.request is not None:
+                self._coordinator.async_promote(block.request, priority)
+        # shield: anulowanie jednego z czekających nie przerywa wspólnego odczytu
+        return await asyncio.shield(block.pending)
+
+    @staticmethod
+    def _clear_pending(block, task):
+        if block.pending is task:
+            block.pending = None
+
+    async def _async_do_read_block(self, block, request):
+        """Czeka na wynik zapytania odczytu bloku z kolejki huba i zapisuje go."""
+        _LOGGER.debug("Reading %d addresses from %s to %s", block.count, block.start, block.end)
+        try:
+            result = await request.future
+        except HubUnavailableError as e:
+            # Bezpiecznik otwarty - dostępność encji zmienia koordynator huba
+            _LOGGER.debug("Skipping read of %s: %s", block, e)
+            return False
+        except Exception as e:
+            # Błędy zbiera bezpiecznik huba - jedna linia logu na zmianę jego stanu
+            _LOGGER.debug("Error reading %s: %s", block, e)
+            self._block_failed(block)
+            return False
+        finally:
+            block.request = None
+
+        if not result:
+            _LOGGER.debug("%s read error from address %s for %s addresses",
+                          type(self).__name__, block.start, block.count)
+            self._block_failed(block)
+            return False
+
+        was_stale = block.stale
+        was_available = block.available
+        block.failures = 0
+        changed = self._store_block(block, result)
+        if changed:
+            if block.speed_up():
+                _LOGGER.debug("%s: change detected, polling %s", self._name, block)
+        elif block.slow_down():
+            _LOGGER.debug("%s: no changes, polling %s", self._name, block)
+        if was_stale or not was_available:
+            # Pierwszy odczyt po przywróceniu migawki (lub po awarii) potwierdza
+            # wszystkie adresy bloku
+            self._mark_changed(block)
+        block.last_read = time.monotonic()
+        block.generation += 1
+        _LOGGER.debug("Successfully read %s addresses from %s (generation %s)",
+                      block.count, block.start, block.generation)
+        return True
+
+    def _block_failed(self, block):
+        """
+        Zapisuje nieudany odczyt bloku.
+
+        Gdy blok staje się niedostępny, wszystkie jego adresy są oznaczane jako
+        zmienione - jedno rozesłanie powiadamia wszystkie encje bloku.
+        """
+        was_available = block.available
+        block.failures += 1
+        if was_available and not block.available:
+            _LOGGER.debug("%s: %s unavailable after %d failed reads", self._name, block, block.failures)
+            self._mark_changed(block)
+
+    async def async_refresh(self, age_factor=None, interval=None, priority=PRIORITY_POLL):
+        """
+        Odczytuje zaplanowane bloki; zwraca True jeśli któryś się udał.
+
+        Z `interval` odczytywane są tylko bloki tego taktu koordynatora.
+        Z `age_factor` tylko bloki, których czas minął (ModbusBlock.due) -
+        świeże bloki (np. po weryfikacji zapisu) i bloki adaptacyjne
+        w fazie wolnego odpytywania są pomijane. `priority` to priorytet
+        odczytów w kolejce huba.
+        """
+        blocks = self.get_blocks()
+        if interval is not None:
+            blocks = [block for block in blocks if block.tick == interval]
+        if age_factor is not None:
+            now = time.monotonic()
+            blocks = [block for block in blocks if block.due(age_factor, now)]
+        if not blocks:
+            return False
+        results = await asyncio.gather(*(self._async_read_block(block, priority) for block in blocks))
+        if not any(results):
+            return False
+
+        self._doread = False
+        self._lastread = datetime.datetime.now()
+        return True
+
+    async def async_refresh_addresses(self, addresses, priority=PRIORITY_REFRESH):
+        """
+        Odczytuje bloki pokrywające podane adresy i powiadamia encje.
+
+        Adresy z jednego bloku kosztują jeden odczyt (np. krańcówki wszystkich
+        poruszających się rolet); odczyt już trwający jest współdzielony.
+        Zwraca True jeśli któryś odczyt się udał.
+        """
+        blocks = []
+        for address in addresses:
+            block = self.get_block(address)
+            if block is not None and block not in blocks:
+                blocks.append(block)
+        if not blocks:
+            return False
+        results = await asyncio.gather(*(self._async_read_block(block, priority) for block in blocks))
+        self.async_dispatch_changes()
+        return any(results)
+
+    async def _async_ensure_fresh(self, address, count=1):
+        """
+        Zwraca blok adresu, odczytując go ponownie, jeśli jest starszy niż jego interwał.
+
+        Przeterminowany adres odświeża cały blok (jeden round-trip), a nie
+        pojedynczy adres. None, gdy adres nie jest pokryty żadnym blokiem.
+        """
+        block = self.get_value_block(address, count)
+        if block is None:
+            return None
+        if block.expired(block.max_age):
+            _LOGGER.debug("%s expired (age %s), refreshing block", block, block.age())
+            await self._async_read_block(block, PRIORITY_REFRESH)
+            # Także po błędzie - blok mógł właśnie stać się niedostępny
+            self.async_dispatch_changes()
+        return block
+
+    async def async_poll(self, interval=None):
+        """Jeden cykl koordynatora: odczyt bloków danego interwału i powiadomienie encji."""
+        # Połowa interwału jako próg: blok odczytany tuż przed cyklem (np. przy
+        # weryfikacji zapisu) nie jest czytany drugi raz
+        await self.async_refresh(0.5, interval)
+        # Rozsyłamy także po nieudanym cyklu - zmiany dostępności bloków
+        self.async_dispatch_changes()
+
+
+class ModbusCoilBuffer(ModbusBuffer):
+
+    TABLE = "coils"
+    READ_CALL_TYPE = CALL_TYPE_COIL
+    MAX_COUNT = MAX_COILS_PER_READ
+    DEFAULT_MAX_GAP = DEFAULT_COIL_MAX_GAP
+
+    def __init__(self, name, hass, hub_name, slave, scan_interval, max_gap=None, min_interval=None):
+        super().__init__(name, hass, hub_name, slave, scan_interval, max_gap, min_interval)
+        self._mincoil = 9999
+        self._maxcoil = 0
+        # coil -> wartość do zapisania w najbliższym oknie
+        self._pending_writes = {}
+        # coil -> lista futures czekających na zatwierdzenie zapisu
+        self._write_waiters = {}
+        self._cancel_write_flush = None
+        self._write_requests = 0
+        self._write_calls = 0
+        # coil -> (oczekiwana wartość, lista callbacków błędu weryfikacji)
+        self._pending_verify = {}
+        self._cancel_verify = None
+        self._verify_mismatches = 0
+        _LOGGER.debug("ModbusCoilBuffer initialized: name=%s, hub_name=%s, slave=%s, scan_interval=%s",
+                     name, hub_name, slave, scan_interval)
+
+    def set_coil(self, coil, interval=None):
+        self._add_span(coil, 1, interval)
+        if(coil < self._mincoil):
+            self._mincoil = coil
+            self._doread = True
+            _LOGGER.debug("Updated mincoil to: %s", coil)
+        if(coil > self._maxcoil):
+            self._maxcoil = coil
+            self._doread = True
+            _LOGGER.debug("Updated maxcoil to: %s", coil)
+
+    def _new_image(self, count):
+        # Jeden bajt (0/1) na coil - aktualizacja po odczycie to kopia wycinka
+        return bytearray(count)
+
+    def refresh(self):
+        self._doread = True
+        # Czyścimy cache przy refresh
+        self.invalidate()
+        _LOGGER.debug("Buffer refresh requested")
+
+    def clear_coil_cache(self, coil=None):
+        """Czyści cache dla konkretnego coila lub całego cache'a."""
+        self.invalidate(coil)
+        _LOGGER.debug("Cleared coil cache for: %s", "all" if coil is None else coil)
+
+    async def force_read_coil(self, coil):
+        """Wymusza odczyt coila z pominięciem cache'a."""
+        _LOGGER.debug("Force reading coil: %s", coil)
+        # Odczytujemy pojedynczy coil (wynik trafia do obrazu procesu)
+        return await self.async_read_single_coil(coil)
+
+    def is_coil_cached(self, coil):
+        """Sprawdza czy coil jest w cache'u."""
+        block = self.get_block(coil)
+        return block is not None and block.valid
+
+    def get_cached_coil_state(self, coil):
+        """Zwraca stan coila z cache'a (None jeśli nie ma w cache)."""
+        block = self.get_block(coil)
+        if block is None or not block.valid:
+            return None
+        return block.image[coil - block.start] == 1
+
+    def _set_cached_coil(self, coil, value):
+        """Wpisuje znaną wartość coila (np. po zapisie) do obrazu procesu."""
+        value = 1 if value else 0
+        # Coil może leżeć także w dziurze bloku wolniejszej grupy - obrazy zostają spójne
+        for block in self.get_blocks():
+            if coil in block and block.image[coil - block.start] != value:
+                block.image[coil - block.start] = value
+                self._changed.add(coil)
+
+    def debug_cache(self):
+        """Debuguje zawartość cache'a."""
+        for block in self.get_blocks():
+            _LOGGER.debug("%s valid=%s image=%s", block, block.valid, block.image.hex())
+        _LOGGER.debug("Min coil: %s, Max coil: %s", self._mincoil, self._maxcoil)
+
+    def should_refresh_cache(self):
+        """Sprawdza czy cache wymaga odświeżenia na podstawie scan_interval."""
+        if not self._scan_interval:
+            return False
+        now = time.monotonic()
+        return any(block.expired(block.max_age, now) for block in self.get_blocks())
+
+    async def smart_read_coils(self, coils_to_read=None):
+        """Inteligentny odczyt coilów - używa cache'a gdy możliwe, odczytuje tylko gdy trzeba."""
+        if coils_to_read is None:
+            coils_to_read = list(self._spans)
+
+        coils_to_read = list(set(coils_to_read))  # Usuwamy duplikaty
+
+        # Sprawdzamy które coile są już w cache'u i aktualne
+        coils_in_cache = [coil for coil in coils_to_read if self.is_coil_cached(coil)]
+        coils_not_in_cache = [coil for coil in coils_to_read if not self.is_coil_cached(coil)]
+
+        _LOGGER.debug("Smart read: %d coils in cache, %d coils need reading",
+                     len(coils_in_cache), len(coils_not_in_cache))
+
+        # Jeśli wszystkie coile są w cache'u i cache jest aktualny, zwracamy wyniki z cache'a
+        if not coils_not_in_cache and not self.should_refresh_cache():
+            _LOGGER.debug("All coils in cache, returning cached values")
+            return {coil: self.get_cached_coil_state(coil) for coil in coils_to_read}
+
+        # Odczytujemy coile których nie ma w cache'u
+        if coils_not_in_cache:
+            for coil in coils_not_in_cache:
+                await self.async_read_single_coil(coil)
+
+        # Zwracamy wszystkie żądane coile (z cache'a lub świeżo odczytane)
+        return {coil: bool(self.get_cached_coil_state(coil)) for coil in coils_to_read}
+
+    def get_performance_stats(self):
+        """Zwraca statystyki wydajności cache'a."""
+        total_coils = sum(block.count for block in self.get_blocks())
+        cached_coils = sum(block.count for block in self._blocks if block.valid)
+        cache_hit_rate = (cached_coils / total_coils * 100) if total_coils > 0 else 0
+
+        return {
+            'total_coils': total_coils,
+            'read_blocks': len(self._blocks),
+            'coalesced_reads': self._coalesced_reads,
+            'write_requests': self._write_requests,
+            'write_calls': self._write_calls,
+            'verify_mismatches': self._verify_mismatches,
+            'cached_coils': cached_coils,
+            'cache_hit_rate': round(cache_hit_rate, 2),
+            'last_read': self._lastread.isoformat() if self._lastread else None,
+            'scan_interval': str(self._scan_interval) if self._scan_interval else None,
+            'poll_intervals': [block.max_age for block in self._blocks],
+            'unavailable_blocks': sum(1 for block in self._blocks if not block.available),
+            'request_queue': self._coordinator.get_queue_stats(),
+            'poll_cycles': self._coordinator.get_poll_stats()
+        }
+
+    async def async_read_single_coil(self, coil):
+        """Odczyt pojedynczego coila - szybszy niż odczyt całego zakresu."""
+        _LOGGER.debug("Reading single coil: %s", coil)
+        self.checkhub()
+        if(self._hub is None):
+            _LOGGER.error("Cannot read coil %s: hub not available", coil)
+            return False
+
+        try:
+            # Pojedynczy coil przez kolejkę huba, przed rutynowym odpytywaniem
+            result = await self._async_hub_call(PRIORITY_REFRESH, coil, 1, CALL_TYPE_COIL)
+            if result and hasattr(result, 'bits') and len(result.bits) > 0:
+                coil_state = bool(result.bits[0])
+                # Aktualizujemy cache
+                self._set_cached_coil(coil, coil_state)
+                _LOGGER.debug("Single coil %s read successfully: %s", coil, coil_state)
+                return coil_state
+            else:
+                _LOGGER.debug("Failed to read single coil %s", coil)
+                return False
+        except Exception as e:
+            _LOGGER.debug("Error reading single coil %s: %s", coil, e)
+            return False
+
+    def _store_block(self, block, result):
+        """Aktualizujemy obraz procesu bloku jedną kopią wycinka."""
+        bits = bytes(result.bits[:block.count])
+        changed = True
+        if block.valid:
+            offsets = changed_offsets(block.image[:len(bits)], bits)
+            changed = bool(offsets)
+            self._mark_changed(block, offsets)
+        else:
+            self._mark_changed(block)
+        block.image[:len(bits)] = bits
+        block.valid = True
+        return changed
+
+    async def async_read_coil(self, coil):
+        """Async version of read_coil for use in async context."""
+        # Wartość z cache jest ważna przez scan_interval - potem odświeżamy cały blok
+        if await self._async_ensure_fresh(coil) is None:
+            _LOGGER.error("Coil %s not covered by any read block", coil)
+            return False
+
+        result = self.get_cached_coil_state(coil)
+        if result is None:
+            _LOGGER.debug("No valid data for coil %s", coil)
+            return False
+
+        _LOGGER.debug("Coil %s state: %s", coil, result)
+        return result
+
+    async def async_write_coil(self, coil, value, verify_after_write=True, on_verify_failed=None,
+                               write_window=None):
+        """
+        Async version of write_coil with optional verification.
+
+        Zapis trafia do okna zapisu (`write_window` sekund, domyślnie
+        DEFAULT_WRITE_WINDOW); wszystkie zapisy z okna są łączone w ciągłe
+        serie i wysyłane jako FC15 (write_coils). Zwraca True, gdy zapis tego
+        coila został potwierdzony przez sterownik - weryfikacja odbywa się
+        później, zbiorczo, a rozbieżność zgłaszana jest przez on_verify_failed.
+        """
+        _LOGGER.debug("Async writing coil %s to value: %s (verify: %s)", coil, value, verify_after_write)
+        self.checkhub()
+        if(self._hub is None):
+            _LOGGER.error("Cannot write coil %s: hub not available", coil)
+            return False
+
+        future = self._hass.loop.create_future()
+        self._pending_writes[coil] = bool(value)
+        self._write_waiters.setdefault(coil, []).append(future)
+        self._write_requests += 1
+        self._async_arm_write_flush(write_window)
+
+        if not await future:
+            return False
+
+        if verify_after_write:
+            self._async_queue_verify(coil, bool(value), on_verify_failed)
+        return True
+
+    @callback
+    def _async_queue_verify(self, coil, value, on_verify_failed=None):
+        """Dodaje coil do najbliższej zbiorczej weryfikacji."""
+        _, callbacks = self._pending_verify.get(coil, (None, []))
+        if on_verify_failed is not None:
+            callbacks.append(on_verify_failed)
+        self._pending_verify[coil] = (value, callbacks)
+        if self._cancel_verify is None:
+            self._cancel_verify = async_call_later(
+                self._hass, DEFAULT_VERIFY_DELAY, self._async_schedule_verify)
+
+    @callback
+    def _async_schedule_verify(self, now=None):
+        self._cancel_verify = None
+        self._hass.async_create_task(self.async_verify_writes())
+
+    async def async_verify_writes(self):
+        """
+        Zbiorcza weryfikacja zapisanych coilów.
+
+        Odczytujemy bloki zawierające zapisane coile (jeden odczyt na blok,
+        przy okazji odświeżając wspólny cache), a potem porównujemy wartości.
+        """
+        pending = self._pending_verify
+        self._pending_verify = {}
+        if not pending:
+            return
+
+        # Blok właściciela coila - nie blok wolniejszej grupy, który go tylko przeskakuje
+        blocks = list(dict.fromkeys(block for block in map(self.get_block, pending) if block is not None))
+        _LOGGER.debug("Verifying %d written coils with %d block reads", len(pending), len(blocks))
+        await asyncio.gather(*(self._async_read_block(block, PRIORITY_COMMAND) for block in blocks))
+
+        for coil, (expected, callbacks) in pending.items():
+            actual = self.get_cached_coil_state(coil)
+            if actual == expected:
+                _LOGGER.debug("Coil %s verification successful: %s", coil, actual)
+                continue
+            self._verify_mismatches += 1
+            _LOGGER.warning("Coil %s verification failed: expected %s, got %s", coil, expected, actual)
+            for on_verify_failed in callbacks:
+                on_verify_failed(actual)
+
+        self.async_dispatch_changes()
+
+    @callback
+    def _async_schedule_write_flush(self, now=None):
+        """Koniec okna zapisu - wysyłamy zebrane zapisy."""
+        self._cancel_write_flush = None
+        self._hass.async_create_task(self.async_flush_writes())
+
+    async def async_flush_writes(self):
+        """Wysyła zebrane zapisy coilów jako ciągłe serie FC15."""
+        pending = self._pending_writes
+        waiters = self._write_waiters
+        self._pending_writes = {}
+        self._write_waiters = {}
+        if not pending:
+            return
+
+        runs = group_contiguous(pending, MAX_COILS_PER_WRITE)
+        _LOGGER.debug("Flushing %d coil writes as %d requests", len(pending), len(runs))
+        results = await asyncio.gather(
+            *(self._async_write_run(start, [pending[coil] for coil in coils]) for start, coils in runs))
+
+        for (start, coils), committed in zip(runs, results):
+            for coil in coils:
+                if committed:
+                    # Aktualizujemy cache
+                    self._set_cached_coil(coil, pending[coil])
+                    # Polecenie użytkownika - blok coila odpytywany szybciej
+                    self.note_activity(coil)
+                for future in waiters.get(coil, ()):
+                    if not future.done():
+                        future.set_result(committed)
+
+        # Inne encje na tych samych coilach (np. binary_sensor) dostają nowy stan od razu
+        self.async_dispatch_changes()
+
+    async def _async_write_run(self, start, values):
+        """Zapisuje ciągłą serię coilów jednym zapytaniem."""
+        self._write_calls += 1
+        try:
+            # Zapisy mają najwyższy priorytet w kolejce huba
+            if len(values) == 1:
+                # Pojedynczy coil - FC5
+                result = await self._async_hub_call(PRIORITY_COMMAND, start, values[0], CALL_TYPE_WRITE_COIL)
+            else:
+                result = await self._async_hub_call(PRIORITY_COMMAND, start, values, CALL_TYPE_WRITE_COILS)
+        except Exception as e:
+            _LOGGER.debug("Error writing coils %s-%s: %s", start, start + len(values) - 1, e)
+            return False
+
+        if not result:
+            _LOGGER.debug("Failed to write coils %s-%s", start, start + len(values) - 1)
+            return False
+        _LOGGER.debug("Successfully wrote coils %s-%s: %s", start, start + len(values) - 1, values)
+        return True
+
+
+class ModbusRegisterBuffer(ModbusBuffer):
+
+    TABLE = "holding"
+    READ_CALL_TYPE = CALL_TYPE_REGISTER_HOLDING
+    MAX_COUNT = MAX_REGISTERS_PER_READ
+    DEFAULT_MAX_GAP = DEFAULT_REGISTER_MAX_GAP
+
+    def __init__(self, name, hass, hub_name, slave, scan_interval, max_gap=None, min_interval=None):
+        super().__init__(name, hass, hub_name, slave, scan_interval, max_gap, min_interval)
+        self._minreg = 99999
+        self._maxreg = 0
+        self._decoders = []
+        self._assign_decoders = False
+        # rejestr -> wartość do zapisania w najbliższym oknie
+        self._pending_writes = {}
+        # rejestry, których zapisane wartości trafiają od razu do obrazu procesu
+        self._cache_writes = set()
+        # lista (future, rejestry) czekających na zatwierdzenie zapisu
+        self._write_waiters = []
+        self._cancel_write_flush = None
+        self._write_requests = 0
+        self._write_calls = 0
+        # rejestry czekające na zbiorczą weryfikację po poleceniu
+        self._pending_verify = set()
+        self._cancel_verify = None
+        _LOGGER.debug("ModbusRegisterBuffer initialized: name=%s, hub_name=%s, slave=%s, scan_interval=%s",
+                     name, hub_name, slave, scan_interval)
+
+    def set_register(self, register, count, interval=None):
+        self._add_span(register, count, interval)
+        if(register < self._minreg):
+            self._minreg = register
+            self._doread = True
+            _LOGGER.debug("Updated minreg to: %s", register)
+        if(register+count-1 > self._maxreg):
+            self._maxreg = register+count-1
+            self._doread = True
+            _LOGGER.debug("Updated maxreg to: %s", register+count-1)
+        _LOGGER.debug("Sensor buffer min/max %s / %s", self._minreg, self._maxreg)
+
+    def add_decoder(self, decoder, interval=None):
+        """Rejestruje skompilowany dekoder sensora (odpytywany co `interval`); zwraca go."""
+        self.set_register(decoder.address, decoder.count, interval)
+        self._decoders.append(decoder)
+        self._assign_decoders = True
+        return decoder
+
+    def get_blocks(self):
+        """Zwraca bloki odczytu i przypisuje im dekodery po zmianie planu."""
+        replan = self._replan
+        blocks = super().get_blocks()
+        if replan or self._assign_decoders:
+            self._assign_decoders = False
+            for block in blocks:
+                block.decoders = []
+            for decoder in self._decoders:
+                block = self.get_value_block(decoder.address, decoder.count)
+                if block is not None:
+                    block.decoders.append(decoder)
+            for block in blocks:
+                if block.valid:
+                    self._decode_block(block)
+        return blocks
+
+    def _decode_block(self, block, sample=False):
+        """
+        Dekoduje wszystkie wartości bloku jednym przebiegiem po obrazie procesu.
+
+        Wartość dekodera z filtrem publikacji jest aktualizowana tylko wtedy,
+        gdy filtr ją przepuści - encja nie widzi zmian w deadbandzie. Filtry
+        dostają tylko próbki z odczytu bloku (`sample`); przeplanowanie,
+        migawka i zapis zwrotny nie ruszają ich okien ani punktu odniesienia.
+        """
+        if not block.decoders:
+            return
+        views = block_views(block.image)
+        start = block.start
+        now = time.monotonic()
+        for decoder in block.decoders:
+            value = decoder.decode(views, start)
+            if decoder.filter is None:
+                decoder.value = value
+            elif not sample:
+                # Bez próbki wartość filtrowana zostaje; brak wartości (np. po
+                # migawce sprzed restartu) uzupełniamy surową
+                if decoder.value is None:
+                    decoder.value = value
+            elif decoder.filter.accept(value, now):
+                # Filtr może publikować inną wartość niż próbka (np. agregat z okna)
+                value = decoder.filter.published
+                if value != decoder.value:
+                    # Publikacja może nastąpić bez zmiany obrazu (max_interval)
+                    self._changed.update(range(decoder.address, decoder.address + decoder.count))
+                decoder.value = value
+
+    def get_decoded_value(self, decoder):
+        """Zwraca zdekodowaną wartość (None gdy blok nie ma poprawnych danych)."""
+        block = self.get_value_block(decoder.address, decoder.count)
+        if block is None or not block.valid:
+            return None
+        return decoder.value
+
+    def _new_image(self, count):
+        # Rejestry 16-bitowe bez znaku - aktualizacja po odczycie to kopia wycinka
+        return array('H', bytes(2 * count))
+
+    def refresh(self):
+        self._doread = True
+        # Czyścimy cache przy refresh
+        self.invalidate()
+        _LOGGER.debug("Buffer refresh requested")
+
+    def clear_register_cache(self, register=None):
+        """Czyści cache dla konkretnego rejestru lub całego cache'a."""
+        self.invalidate(register)
+        _LOGGER.debug("Cleared register cache for: %s", "all" if register is None else register)
+
+    async def force_read_register(self, register, count):
+        """Wymusza odczyt rejestru z pominięciem cache'a."""
+        _LOGGER.debug("Force reading register: %s", register)
+        # Odczytujemy pojedynczy rejestr (wynik trafia do obrazu procesu)
+        return await self.async_read_single_register(register, count)
+
+    def is_register_cached(self, register):
+        """Sprawdza czy rejestr jest w cache'u."""
+        block = self.get_block(register)
+        return block is not None and block.valid
+
+    def get_cached_register_value(self, register):
+        """Zwraca wartość rejestru z cache'a (None jeśli nie ma w cache)."""
+        return self.get_cached_registers(register, 1)
+
+    def get_cached_registers(self, register, count):
+        """Zwraca `count` kolejnych rejestrów z cache'a (None jeśli któregoś brakuje)."""
+        block = self.get_value_block(register, count)
+        if block is None or not block.valid:
+            return None
+        offset = register - block.start
+        if offset + count > block.count:
+            return None
+        return block.image[offset:offset + count].tolist()
+
+    def _set_cached_registers(self, register, values):
+        """Wpisuje znane wartości rejestrów (np. z pojedynczego odczytu) do obrazu procesu."""
+        end = register + len(values) - 1
+        # Rejestry mogą leżeć także w dziurze bloku wolniejszej grupy - obrazy zostają spójne
+        for block in self.get_blocks():
+            if block.end < register or end < block.start:
+                continue
+            first = max(register, block.start)
+            part = array('H', values[first - register:min(end, block.end) - register + 1])
+            offset = first - block.start
+            if block.image[offset:offset + len(part)] != part:
+                block.image[offset:offset + len(part)] = part
+                self._changed.update(range(first, first + len(part)))
+                self._decode_block(block)
+
+    def debug_cache(self):
+        """Debuguje zawartość cache'a."""
+        for block in self.get_blocks():
+            _LOGGER.debug("%s valid=%s image=%s", block, block.valid, block.image.tolist())
+        _LOGGER.debug("Min register: %s, Max register: %s", self._minreg, self._maxreg)
+
+    def should_refresh_cache(self):
+        """Sprawdza czy cache wymaga odświeżenia na podstawie scan_interval."""
+        if not self._scan_interval:
+            return False
+        now = time.monotonic()
+        return any(block.expired(block.max_age, now) for block in self.get_blocks())
+
+    async def async_read_single_register(self, register, count):
+        """Odczyt pojedynczego rejestru - szybszy niż odczyt całego zakresu."""
+        _LOGGER.debug("Reading single register: %s, count: %s", register, count)
+        self.checkhub()
+        if(self._hub is None):
+            _LOGGER.error("Cannot read register %s: hub not available", register)
+            return None
+
+        try:
+            # Pojedynczy rejestr przez kolejkę huba, przed rutynowym odpytywaniem
+            result = await self._async_hub_call(PRIORITY_REFRESH, register, count, self.READ_CALL_TYPE)
+            if result and hasattr(result, 'registers') and len(result.registers) > 0:
+                register_values = list(result.registers)
+                # Aktualizujemy cache
+                self._set_cached_registers(register, register_values)
+                _LOGGER.debug("Single register %s read successfully: %s", register, register_values)
+                return register_values
+            else:
+                _LOGGER.debug("Failed to read single register %s", register)
+                return None
+        except Exception as e:
+            _LOGGER.debug("Error reading single register %s: %s", register, e)
+            return None
+
+    def _store_block(self, block, result):
+        """Aktualizujemy obraz procesu bloku jedną kopią wycinka."""
+        registers = array('H', result.registers[:block.count])
+        if block.valid:
+            offsets = changed_offsets(block.image[:len(registers)].tobytes(), registers.tobytes(), 2)
+            if not offsets:
+                # Obraz bez zmian, ale filtr może czekać z publikacją na upływ interwału
+                if any(decoder.filter is not None and decoder.filter.pending for decoder in block.decoders):
+                    self._decode_block(block, sample=True)
+                return False
+            self._mark_changed(block, offsets)
+        else:
+            self._mark_changed(block)
+        block.image[:len(registers)] = registers
+        block.valid = True
+        # Dekodujemy tylko, gdy obraz bloku się zmienił
+        self._decode_block(block, sample=True)
+        return True
+
+    async def async_write_registers(self, register, values, update_cache=False, write_window=None):
+        """
+        Zapisuje kolejne rejestry od `register`; zwraca True po zatwierdzeniu.
+
+        Zapis trafia do okna zapisu (`write_window` sekund, domyślnie
+        DEFAULT_WRITE_WINDOW); wszystkie zapisy z okna (np. nastawy kilku
+        stref) są łączone w ciągłe serie i wysyłane jako FC16 (FC6 dla
+        pojedynczego rejestru). Z `update_cache` zapisane wartości trafiają od
+        razu do obrazu procesu. Bez niego obraz się nie zmienia - sterownik
+        może odpowiedzieć na polecenie innym stanem (np. switch z command_on
+        != state_on); stan przynosi weryfikacja (async_request_verify) albo
+        najbliższy cykl odpytywania.
+        """
+        _LOGGER.debug("Async writing registers %s: %s", register, values)
+        self.checkhub()
+        if(self._hub is None):
+            _LOGGER.error("Cannot write register %s: hub not available", register)
+            return False
+
+        future = self._hass.loop.create_future()
+        registers = range(register, register + len(values))
+        for address, value in zip(registers, values):
+            self._pending_writes[address] = value
+            if update_cache:
+                self._cache_writes.add(address)
+            else:
+                self._cache_writes.discard(address)
+        self._write_waiters.append((future, registers))
+        self._write_requests += 1
+        self._async_arm_write_flush(write_window)
+        return await future
+
+    @callback
+    def _async_schedule_write_flush(self, now=None):
+        """Koniec okna zapisu - wysyłamy zebrane zapisy."""
+        self._cancel_write_flush = None
+        self._hass.async_create_task(self.async_flush_writes())
+
+    async def async_flush_writes(self):
+        """Wysyła zebrane zapisy rejestrów jako ciągłe serie FC16."""
+        pending = self._pending_writes
+        cache_writes = self._cache_writes
+        waiters = self._write_waiters
+        self._pending_writes = {}
+        self._cache_writes = set()
+        self._write_waiters = []
+        if not pending:
+            return
+
+        runs = group_contiguous(pending, MAX_REGISTERS_PER_WRITE)
+        _LOGGER.debug("Flushing %d register writes as %d requests", len(pending), len(runs))
+        results = await asyncio.gather(
+            *(self._async_write_run(start, [pending[register] for register in registers])
+              for start, registers in runs))
+
+        committed = {}
+        for (start, registers), result in zip(runs, results):
+            for register in registers:
+                committed[register] = result
+            if result:
+                cached = [register for register in registers if register in cache_writes]
+                for run_start, run in group_contiguous(cached, MAX_REGISTERS_PER_WRITE):
+                    self._set_cached_registers(run_start, [pending[register] for register in run])
+                # Polecenie użytkownika - blok rejestru odpytywany szybciej
+                self.note_activity(start)
+
+        for future, registers in waiters:
+            if not future.done():
+                future.set_result(all(committed.get(register) for register in registers))
+
+        # Inne encje na tych samych rejestrach dostają nowy stan od razu
+        self.async_dispatch_changes()
+
+    async def _async_write_run(self, start, values):
+        """Zapisuje ciągłą serię rejestrów jednym zapytaniem."""
+        self._write_calls += 1
+        try:
+            # Zapisy mają najwyższy priorytet w kolejce huba
+            if len(values) == 1:
+                result = await self._async_hub_call(PRIORITY_COMMAND, start, values[0], CALL_TYPE_WRITE_REGISTER)
+            else:
+                result = await self._async_hub_call(PRIORITY_COMMAND, start, values, CALL_TYPE_WRITE_REGISTERS)
+        except Exception as e:
+            _LOGGER.debug("Error writing registers %s-%s: %s", start, start + len(values) - 1, e)
+            return False
+
+        if not result:
+            _LOGGER.debug("Failed to write registers %s-%s", start, start + len(values) - 1)
+            return False
+        _LOGGER.debug("Successfully wrote registers %s-%s: %s", start, start + len(values) - 1, values)
+        return True
+
+    @callback
+    def async_request_verify(self, register):
+        """
+        Dodaje rejestr do najbliższej zbiorczej weryfikacji.
+
+        Weryfikacja odczytuje cały blok rejestru (z priorytetem polecenia),
+        więc stan po poleceniu przychodzi z tego samego odczytu, z którego
+        korzystają pozostałe encje bloku.
+        """
+        self._pending_verify.add(register)
+        if self._cancel_verify is None:
+            self._cancel_verify = async_call_later(
+                self._hass, DEFAULT_VERIFY_DELAY, self._async_schedule_verify)
+
+    @callback
+    def _async_schedule_verify(self, now=None):
+        self._cancel_verify = None
+        self._hass.async_create_task(self.async_verify_writes())
+
+    async def async_verify_writes(self):
+        """Odczytuje bloki rejestrów czekających na weryfikację i powiadamia encje."""
+        pending = self._pending_verify
+        self._pending_verify = set()
+        # Blok właściciela rejestru - nie blok wolniejszej grupy, który go tylko przeskakuje
+        blocks = list(dict.fromkeys(block for block in map(self.get_block, pending) if block is not None))
+        if not blocks:
+            return
+        _LOGGER.debug("Verifying %d registers with %d block reads", len(pending), len(blocks))
+        await asyncio.gather(*(self._async_read_block(block, PRIORITY_COMMAND) for block in blocks))
+        self.async_dispatch_changes()
+
+    async def async_read_register(self, register, count):
+        """Async version of read_register for use in async context."""
+        # Wartość z cache jest ważna przez scan_interval - potem odświeżamy cały blok
+        if await self._async_ensure_fresh(register, count) is None:
+            _LOGGER.error("Register %s not covered by any read block", register)
+            return None
+
+        result_values = self.get_cached_registers(register, count)
+        if result_values is None:
+            _LOGGER.debug("No valid data for register %s", register)
+            return None
+
+        _LOGGER.debug("Register %s values: %s", register, result_values)
+        return result_values
+
+    def get_performance_stats(self):
+        """Zwraca statystyki wydajności cache'a."""
+        total_registers = sum(block.count for block in self.get_blocks())
+        cached_registers = sum(block.count for block in self._blocks if block.valid)
+        cache_hit_rate = (cached_registers / total_registers * 100) if total_registers > 0 else 0
+
+        return {
+            'total_registers': total_registers,
+            'read_blocks': len(self._blocks),
+            'coalesced_reads': self._coalesced_reads,
+            'suppressed_publishes': sum(decoder.filter.suppressed for decoder in self._decoders
+                                        if decoder.filter is not None),
+            'write_requests': self._write_requests,
+            'write_calls': self._write_calls,
+            'cached_registers': cached_registers,
+            'cache_hit_rate': round(cache_hit_rate, 2),
+            'last_read': self._lastread.isoformat() if self._lastread else None,
+            'scan_interval': str(self._scan_interval) if self._scan_interval else None,
+            'poll_intervals': [block.max_age for block in self._blocks],
+            'unavailable_blocks': sum(1 for block in self._blocks if not block.available),
+            'request_queue': self._coordinator.get_queue_stats(),
+            'poll_cycles': self._coordinator.get_poll_stats()
+        }
+
+
+class ModbusInputRegisterBuffer(ModbusRegisterBuffer):
+    """Register buffer reading input registers (FC4); input registers are read-only."""
+
+    TABLE = "input"
+    READ_CALL_TYPE = CALL_TYPE_REGISTER_INPUT
+
+    async def async_write_registers(self, register, values, update_cache=False, write_window=None):
+        """Input registers cannot be written."""
+        _LOGGER.error("Cannot write input register %s", register)
+        return False
@@ -0,0 +1,4 @@
+"""Modbus HAS Climate integration."""
+from .climate import async_setup_platform
+
+__all__ = ["async_setup_platform"]
@@ -0,0 +1,267 @@
+"""
+Support for Modbus thermostats (multi-zone).
+
+For more details about this platform, please refer to the documentation at
+https://home-assistant.io/components/climate.modbus/
+"""
+import logging
+import struct
+import voluptuous as vol
+
+from homeassistant.components.modbus.const import DEFAULT_SLAVE
+
+from homeassistant.const import (
+    ATTR_TEMPERATURE,
+    CONF_NAME,
+    CONF_SCAN_INTERVAL,
+    CONF_SLAVE,
+    CONF_UNIQUE_ID,
+    UnitOfTemperature,
+)
+
+from homeassistant.exceptions import HomeAssistantError
+
+from homeassistant.components.climate import (
+    ClimateEntity,
+    ClimateEntityFeature,
+    HVACMode,
+)
+
+from homeassistant.helpers import config_validation as cv
+
+from ..buffer import ModbusRegisterBuffer, async_get_buffer, scan_interval_to_timedelta
+from ..decoder import (
+    compile_decoder,
+    DATA_TYPES,
+    SIZED_DATA_TYPES,
+    DATA_TYPE_FLOAT,
+    WORD_ORDER_BIG,
+    WORD_ORDER_LITTLE,
+    BYTE_ORDER_BIG,
+    BYTE_ORDER_LITTLE,
+)
+from ..entity import ModbusBufferEntity, async_add_buffer_entities
+
+_LOGGER = logging.getLogger(__name__)
+
+# Definiuję własne stałe, ponieważ nie są już dostępne w modbus.const
+CONF_CLIMATES = "climates"
+CONF_TARGET_TEMP = "target_temp_register"
+CONF_CURRENT_TEMP = "current_temp_register"
+CONF_DATA_TYPE = "data_type"
+CONF_COUNT = "data_count"
+CONF_PRECISION = "precision"
+CONF_SCALE = "scale"
+CONF_OFFSET = "offset"
+# Kolejność słów wartości wielorejestrowych: little - młodsze słowo pierwsze
+CONF_WORD_ORDER = "word_order"
+# Kolejność bajtów w rejestrze: little - bajty zamienione
+CONF_BYTE_ORDER = "byte_order"
+
+# Maksymalna dziura (w adresach) łączona w jeden odczyt blokowy
+CONF_MAX_GAP = "max_gap"
+# Okno (w sekundach), w którym nastawy stref łączone są w jedno zapytanie FC16
+CONF_WRITE_WINDOW = "write_window"
+# Odpytywanie adaptacyjne: po zmianie lub poleceniu blok odpytywany jest co
+# min_scan_interval, a gdy milczy - coraz rzadziej, aż do scan_interval
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+
+CLIMATES_SCHEMA = vol.Schema({
+    vol.Required(CONF_NAME): cv.string,
+    vol.Optional(CONF_SLAVE): cv.positive_int,
+    vol.Required(CONF_TARGET_TEMP): cv.positive_int,
+    vol.Required(CONF_CURRENT_TEMP): cv.positive_int,
+    vol.Optional(CONF_COUNT, default=2): cv.positive_int,
+    # Typy liczbowe wspólnej warstwy dekoderów (jak w sensorach), np. int16 ze skalą 0.01
+    vol.Optional(CONF_DATA_TYPE, default=DATA_TYPE_FLOAT): vol.In(list(DATA_TYPES) + list(SIZED_DATA_TYPES)),
+    vol.Optional(CONF_SCALE, default=1): vol.Coerce(float),
+    vol.Optional(CONF_OFFSET, default=0): vol.Coerce(float),
+    vol.Optional(CONF_PRECISION, default=1): cv.positive_int,
+    vol.Optional(CONF_WORD_ORDER, default=WORD_ORDER_BIG): vol.In([WORD_ORDER_BIG, WORD_ORDER_LITTLE]),
+    vol.Optional(CONF_BYTE_ORDER, default=BYTE_ORDER_BIG): vol.In([BYTE_ORDER_BIG, BYTE_ORDER_LITTLE]),
+    vol.Optional(CONF_SCAN_INTERVAL): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Optional(CONF_UNIQUE_ID): cv.string
+})
+
+# Tworzę własny schemat zamiast importować z climate
+PLATFORM_SCHEMA = vol.Schema({
+    vol.Required("platform"): "modbushas",
+    vol.Optional("hub"): cv.string,
+    vol.Optional("scan_interval"): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Optional(CONF_MAX_GAP): cv.positive_int,
+    vol.Optional(CONF_MIN_SCAN_INTERVAL): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Optional(CONF_WRITE_WINDOW): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Required(CONF_CLIMATES): [CLIMATES_SCHEMA]
+})
+
+
+def _create_climates(hass, config):
+    """
+    Tworzy encje stref i zwraca (encje, bufory do primingu).
+
+    Temperatury zadane i bieżące wszystkich stref jednego urządzenia trafiają
+    do wspólnego bufora rejestrów (tego samego co sensory), więc są
+    odczytywane blokowo, a nie osobnym zapytaniem na termostat.
+    """
+    climates = []
+    buffers = []
+    scan_interval = config.get("scan_interval")
+    hub_name = config.get("hub", "fatek")
+    scan_interval_timedelta = scan_interval_to_timedelta(scan_interval)
+    options = {
+        "max_gap": config.get(CONF_MAX_GAP),
+        "min_interval": config.get(CONF_MIN_SCAN_INTERVAL),
+    }
+    # Okno zapisu należy do encji tej platformy, nie do wspólnego bufora
+    write_window = config.get(CONF_WRITE_WINDOW)
+
+    _LOGGER.debug("Climate scan interval: %s (type: %s), hub: %s", scan_interval, type(scan_interval), hub_name)
+
+    for climate in config.get(CONF_CLIMATES, ()):
+        _LOGGER.debug("Adding climate: %s, target register: %s, current register: %s", climate.get(CONF_NAME),
+                      climate.get(CONF_TARGET_TEMP), climate.get(CONF_CURRENT_TEMP))
+        buffer = async_get_buffer(hass, ModbusRegisterBuffer, hub_name,
+                                  climate.get(CONF_SLAVE, DEFAULT_SLAVE), scan_interval_timedelta, **options)
+        try:
+            climates.append(ModbusHASClimate(
+                climate.get(CONF_NAME),
+                climate.get(CONF_TARGET_TEMP),
+                climate.get(CONF_CURRENT_TEMP),
+                climate.get(CONF_COUNT, 2),
+                climate.get(CONF_DATA_TYPE, DATA_TYPE_FLOAT),
+                climate.get(CONF_PRECISION, 1),
+                climate.get(CONF_WORD_ORDER, WORD_ORDER_BIG),
+                buffer,
+                climate.get(CONF_UNIQUE_ID),
+                scan_interval_to_timedelta(climate.get(CONF_SCAN_INTERVAL, scan_interval)),
+                climate.get(CONF_SCALE, 1.0),
+                climate.get(CONF_OFFSET, 0.0),
+                climate.get(CONF_BYTE_ORDER, BYTE_ORDER_BIG),
+                write_window))
+        except ValueError as e:
+            _LOGGER.error("Invalid data type for climate %s: %s", climate.get(CONF_NAME), e)
+            continue
+        buffers.append(buffer)
+
+    return climates, buffers
+
+
+async def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
+    """Setup Modbus thermostats."""
+    _LOGGER.info("Setting up Modbus Climate platform - config: %s", config)
+
+    # Użyj discovery_info jeśli config jest pusty
+    if not config and discovery_info:
+        config = discovery_info
+        _LOGGER.info("Using discovery_info as config")
+
+    climates, buffers = _create_climates(hass, config)
+    _LOGGER.info("Added %d Modbus climates", len(climates))
+    await async_add_buffer_entities(hass, async_add_devices, climates, buffers, "climate")
+
+
+class ModbusHASClimate(ModbusBufferEntity, ClimateEntity):
+    """Representation of a Modbus thermostat zone."""
+    _attr_hvac_mode = HVACMode.HEAT
+    _attr_hvac_modes = [HVACMode.HEAT]
+    _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
+    _attr_temperature_unit = UnitOfTemperature.CELSIUS
+
+    def __init__(self, name, target_temp_register, current_temp_register, count, data_type, precision,
+                 word_order, buffer, unique_id=None, scan_interval=None, scale=1.0, offset=0.0,
+                 byte_order=BYTE_ORDER_BIG, write_window=None):
+        """Initialize the thermostat zone."""
+        self._name = name
+        self._target_temperature_register = int(target_temp_register)
+        self._current_temperature_register = int(current_temp_register)
+        self._buffer = buffer
+        self._write_window = write_window
+        # Wspólna warstwa typów danych - te same dekodery co w sensorach; bufor
+        # dekoduje obie temperatury wszystkich stref po każdym odczycie bloku
+        self._target_decoder = buffer.add_decoder(compile_decoder(
+            self._target_temperature_register, int(count), scale=scale, offset=offset, precision=precision,
+            word_order=word_order, data_type=data_type, byte_order=byte_order), scan_interval)
+        self._current_decoder = buffer.add_decoder(compile_decoder(
+            self._current_temperature_register, int(count), scale=scale, offset=offset, precision=precision,
+            word_order=word_order, data_type=data_type, byte_order=byte_order), scan_interval)
+        # Stan encji to para (nastawa, temperatura bieżąca) - obie z jednego bufora
+        self._buffer_addresses = tuple(
+            address for decoder in (self._target_decoder, self._current_decoder)
+            for address in range(decoder.address, decoder.address + decoder.count))
+        self._attr_target_temperature_step = 10 ** -precision if precision else 1
+
+        # Generujemy unikalny ID dla encji - używamy podany lub generujemy domyślny
+        if unique_id:
+            self._attr_unique_id = unique_id
+        else:
+            self._attr_unique_id = f"modbushas_climate_{name}_{target_temp_register}"
+
+        _LOGGER.debug("ModbusHASClimate initialized: name=%s, target_register=%s, current_register=%s, unique_id=%s",
+                      name, target_temp_register, current_temp_register, self._attr_unique_id)
+
+    def _state_from_buffer(self):
+        """Return the (target, current) temperatures from the process image."""
+        target = self._buffer.get_decoded_value(self._target_decoder)
+        current = self._buffer.get_decoded_value(self._current_decoder)
+        if target is None and current is None:
+            return None
+        # Brak jednej z wartości nie kasuje poprzedniej
+        return (target if target is not None else self.target_temperature,
+                current if current is not None else self.current_temperature)
+
+    @property
+    def name(self):
+        """Return the name of the climate device."""
+        return self._name
+
+    @property
+    def current_temperature(self):
+        """Return the current temperature."""
+        return self._state[1] if self._state else None
+
+    @property
+    def target_temperature(self):
+        """Return the target temperature."""
+        return self._state[0] if self._state else None
+
+    async def async_set_hvac_mode(self, hvac_mode):
+        """Set the HVAC mode (only heating is supported)."""
+        if hvac_mode not in self._attr_hvac_modes:
+            _LOGGER.error("Climate %s: unsupported HVAC mode %s", self._name, hvac_mode)
+
+    async def async_set_temperature(self, **kwargs):
+        """Set new target temperature."""
+        target_temperature = kwargs.get(ATTR_TEMPERATURE)
+        if target_temperature is None:
+            return
+        # Wartość wielorejestrowa kodowana w całości (np. oba słowa float32)
+        try:
+            register_values = self._target_decoder.encode(target_temperature)
+        except (struct.error, OverflowError) as error:
+            # Nastawa poza zakresem typu rejestru (np. int16 po odwróceniu skali)
+            raise HomeAssistantError("Climate {}: setpoint {} out of range of register {}: {}".format(
+                self._name, target_temperature, self._target_temperature_register, error)) from error
+        _LOGGER.debug("Async writing climate %s: register %s = %s (%s)", self._name,
+                      self._target_temperature_register, target_temperature, register_values)
+
+        # Nastawy stref z okna zapisu wysyłane są razem (FC16); zapisana wartość
+        # trafia od razu do obrazu procesu, więc encja dostaje ją przez słuchacza
+        if not await self._buffer.async_write_registers(self._target_temperature_register, register_values,
+                                                        update_cache=True, write_window=self._write_window):
+            _LOGGER.warning("Climate %s: setpoint %s not confirmed", self._name, target_temperature)
+            return
+        # Sterownik może ograniczyć nastawę - potwierdzenie ze zbiorczego odczytu bloku
+        self._buffer.async_request_verify(self._target_temperature_register)
+
+    async def async_update(self):
+        """Async update the state of the climate device."""
+        _LOGGER.debug("Async updating climate state: %s", self._name)
+
+        # Bufor zwraca wartości z obrazu procesu; blok starszy niż scan_interval
+        # jest najpierw odczytywany ponownie w całości
+        await self._buffer.async_read_register(self._target_temperature_register, self._target_decoder.count)
+        await self._buffer.async_read_register(self._current_temperature_register, self._current_decoder.count)
+        self._update_from_buffer()
+
+        _LOGGER.debug("Climate %s async updated: target=%s, current=%s (age %s s)", self._name,
+                      self.target_temperature, self.current_temperature, self.value_age)
@@ -0,0 +1,370 @@
+"""
+Hub-wide poll coordinator for Modbus HAS buffers.
+
+Jeden koordynator na hub: zamiast timera w każdej encji, koordynator
+trzyma jeden timer na interwał i w każdym cyklu odświeża w każdym buforze
+bloki tego interwału.
+Bufory same rozsyłają wyniki do zarejestrowanych encji.
+
+Wszystkie zapytania buforów do huba przechodzą przez kolejkę priorytetową
+koordynatora: zapisy i ich weryfikacja idą pierwsze, odświeżenia na żądanie
+encji potem, a rutynowe odpytywanie na końcu. Do huba trafia jedno zapytanie
+naraz, więc polecenie użytkownika czeka najwyżej na jedno bieżące zapytanie,
+a nie na cały cykl odpytywania.
+
+Cykl, który nie skończył się przed kolejnym taktem timera (wolny PLC,
+zerwane łącze), nie jest kolejkowany drugi raz: takty w trakcie cyklu są
+pomijane i liczone jako przekroczenia (overrun). Każde zapytanie ma limit
+czasu - po jego upływie jest anulowane, a kolejka idzie dalej.
+
+Błędy zapytań obsługuje bezpiecznik huba (breaker.py): gdy hub nie odpowiada,
+zapytania są odrzucane bez ruchu w sieci, cykle odpytywania pomijane, a encje
+dostają jedno powiadomienie o niedostępności. Błędy logowane są jedną linią
+na zmianę stanu bezpiecznika, a nie po jednej na każde zapytanie.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from functools import partial
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from . import DOMAIN
+from .breaker import (
+    CircuitBreaker,
+    HubUnavailableError,
+    STATE_CLOSED,
+    STATE_OPEN,
+    STATE_HALF_OPEN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_COORDINATORS = "coordinators"
+
+# Priorytety zapytań (mniejsza liczba - wcześniej)
+PRIORITY_COMMAND = 0
+PRIORITY_REFRESH = 1
+PRIORITY_POLL = 2
+
+# Limit czasu (w sekundach) pojedynczego zapytania do huba
+DEFAULT_REQUEST_TIMEOUT = 5
+
+PRIORITY_NAMES = {
+    PRIORITY_COMMAND: "command",
+    PRIORITY_REFRESH: "refresh",
+    PRIORITY_POLL: "poll",
+}
+
+
+@callback
+def async_get_coordinator(hass, hub_name):
+    """Zwraca (lub tworzy) koordynatora dla danego huba."""
+    coordinators = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_COORDINATORS, {})
+    coordinator = coordinators.get(hub_name)
+    if coordinator is None:
+        coordinator = ModbusHubCoordinator(hass, hub_name)
+        coordinators[hub_name] = coordinator
+        # Przy zatrzymaniu HA nie zostawiamy cykli ani zapytań w toku
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, coordinator.async_handle_stop)
+    return coordinator
+
+
+class ModbusRequest():
+    """One queued hub request; `future` resolves with the hub result."""
+
+    def __init__(self, priority, call, future):
+        self.priority = priority
+        self.call = call
+        self.future = future
+        self.enqueued = time.monotonic()
+        self.started = False
+
+    def __repr__(self):
+        priority = PRIORITY_NAMES.get(self.priority, self.priority)
+        # Zapytania buforów to partial(hub.async_pb_call, ...) - pokazujemy typ i adres
+        keywords = getattr(self.call, "keywords", None)
+        if keywords:
+            return "ModbusRequest({}, {} at {})".format(priority, keywords.get("use_call"), keywords.get("address"))
+        return "ModbusRequest({}, {})".format(priority, self.call)
+
+
+class ModbusHubCoordinator():
+    """Runs one poll cycle per interval for all buffers attached to a hub."""
+
+    def __init__(self, hass, hub_name):
+        self._hass = hass
+        self._hub_name = hub_name
+        # interwał -> lista buforów odświeżanych w tym cyklu
+        self._groups = {}
+        # interwał -> funkcja anulująca timer
+        self._timers = {}
+        # Kolejka zapytań: kopiec (priorytet, numer kolejny, zapytanie)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._worker = None
+        self._max_depth = 0
+        # priorytet -> [liczba zapytań, suma czasu oczekiwania, najdłuższe oczekiwanie]
+        self._wait_stats = {priority: [0, 0.0, 0.0] for priority in PRIORITY_NAMES}
+        self.request_timeout = DEFAULT_REQUEST_TIMEOUT
+        self._timeouts = 0
+        # interwał -> trwający cykl odpytywania
+        self._cycles = {}
+        # interwał -> [liczba cykli, pominięte takty, suma czasu, najdłuższy, ostatni]
+        self._cycle_stats = {}
+        self._breaker = CircuitBreaker()
+        # Encje bez adresów w buforach (np. switch bez weryfikacji) - tylko dostępność huba
+        self._availability_listeners = []
+        _LOGGER.debug("ModbusHubCoordinator initialized: hub_name=%s", hub_name)
+
+    @property
+    def hub_name(self):
+        """Return the name of the coordinated hub."""
+        return self._hub_name
+
+    @property
+    def available(self):
+        """Return False while the circuit breaker of the hub is not closed."""
+        return self._breaker.closed
+
+    @callback
+    def async_add_buffer(self, buffer, interval):
+        """Dołącza bufor do cyklu odpytywania; zwraca funkcję odłączającą."""
+        group = self._groups.setdefault(interval, [])
+        group.append(buffer)
+        if interval not in self._timers:
+            self._timers[interval] = async_track_time_interval(
+                self._hass,
+                partial(self._async_schedule_poll, interval),
+                interval
+            )
+            _LOGGER.debug("Hub %s: started poll timer every %s", self._hub_name, interval)
+
+        @callback
+        def remove_buffer():
+            if buffer in group:
+                group.remove(buffer)
+            if not group:
+                self._groups.pop(interval, None)
+                cancel = self._timers.pop(interval, None)
+                if cancel:
+                    cancel()
+                    _LOGGER.debug("Hub %s: stopped poll timer every %s", self._hub_name, interval)
+
+        return remove_buffer
+
+    @callback
+    def _async_schedule_poll(self, interval, now=None):
+        """Uruchamia cykl odpytywania dla danego interwału, chyba że poprzedni jeszcze trwa."""
+        if self._breaker.is_open(time.monotonic()):
+            # Hub niedostępny - nie odpytujemy do czasu zapytania próbnego
+            return
+        running = self._cycles.get(interval)
+        if running is not None and not running.done():
+            # Przekroczenie: pomijamy takt zamiast kolejkować drugi cykl - bloki,
+            # których nie zdążył odczytać trwający cykl, odczyta następny
+            stats = self._cycle_stats.setdefault(interval, [0, 0, 0.0, 0.0, 0.0])
+            stats[1] += 1
+            _LOGGER.debug("Hub %s: poll cycle (%s) overrun, skipping tick (%d skipped)",
+                          self._hub_name, interval, stats[1])
+            return
+        self._cycles[interval] = self._hass.async_create_task(self.async_poll(interval))
+
+    async def async_poll(self, interval):
+        """Odświeża raz każdy bufor z grupy danego interwału."""
+        buffers = list(self._groups.get(interval, ()))
+        if not buffers:
+            return
+        _LOGGER.debug("Hub %s: poll cycle (%s) for %d buffers", self._hub_name, interval, len(buffers))
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*(buffer.async_poll(interval) for buffer in buffers))
+        finally:
+            duration = time.monotonic() - started
+            stats = self._cycle_stats.setdefault(interval, [0, 0, 0.0, 0.0, 0.0])
+            stats[0] += 1
+            stats[2] += duration
+            stats[3] = max(stats[3], duration)
+            stats[4] = duration
+            if duration > interval.total_seconds():
+                _LOGGER.debug("Hub %s: poll cycle (%s) took %.3f s", self._hub_name, interval, duration)
+
+    @callback
+    def async_queue_request(self, priority, call):
+        """
+        Dodaje zapytanie do kolejki huba; zwraca ModbusRequest.
+
+        `call` to funkcja bez argumentów zwracająca korutynę zapytania
+        (np. partial(hub.async_pb_call, ...)). Wynik lub wyjątek zapytania
+        trafia do `request.future`.
+        """
+        request = ModbusRequest(priority, call, self._hass.loop.create_future())
+        heapq.heappush(self._queue, (priority, next(self._sequence), request))
+        self._max_depth = max(self._max_depth, len(self._queue))
+        if self._worker is None:
+            self._worker = self._hass.async_create_task(self._async_process_queue())
+        return request
+
+    @callback
+    def async_promote(self, request, priority):
+        """Przesuwa oczekujące zapytanie do wyższego priorytetu (np. weryfikacja dołącza do odczytu)."""
+        if request.started or priority >= request.priority:
+            return
+        _LOGGER.debug("Hub %s: promoting %s to %s", self._hub_name, request, PRIORITY_NAMES.get(priority))
+        request.priority = priority
+        # Stary wpis zostaje w kopcu i jest pomijany, bo zapytanie będzie już rozpoczęte
+        heapq.heappush(self._queue, (priority, next(self._sequence), request))
+
+    async def async_call(self, priority, call):
+        """Wykonuje zapytanie przez kolejkę huba i zwraca jego wynik."""
+        return await self.async_queue_request(priority, call).future
+
+    async def _async_process_queue(self):
+        """Wykonuje zapytania z kolejki po jednym, zawsze najpilniejsze pierwsze."""
+        try:
+            while self._queue:
+                _, _, request = heapq.heappop(self._queue)
+                if request.started or request.future.done():
+                    continue
+                request.started = True
+                now = time.monotonic()
+                state = self._breaker.state
+                if not self._breaker.allow(now):
+                    request.future.set_exception(HubUnavailableError(
+                        "hub {} unavailable, retry in {:.1f} s".format(
+                            self._hub_name, self._breaker.retry_at - now)))
+                    continue
+                self._async_breaker_changed(state)
+                wait = now - request.enqueued
+                stats = self._wait_stats.setdefault(request.priority, [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += wait
+                stats[2] = max(stats[2], wait)
+                try:
+                    # wait_for anuluje zapytanie, które nie zmieściło się w limicie czasu
+                    result = await asyncio.wait_for(request.call(), self.request_timeout)
+                except asyncio.TimeoutError:
+                    self._timeouts += 1
+                    _LOGGER.debug("Hub %s: %s timed out after %s s", self._hub_name, request, self.request_timeout)
+                    error = asyncio.TimeoutError("request timed out after {} s".format(self.request_timeout))
+                    self._async_record_result(error)
+                    if not request.future.done():
+                        request.future.set_exception(error)
+                except Exception as e:
+                    self._async_record_result(e)
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                else:
+                    # Hub zwraca None, gdy zapytanie się nie powiodło
+                    self._async_record_result(None if result else "no response to {}".format(request))
+                    if not request.future.done():
+                        request.future.set_result(result)
+        finally:
+            self._worker = None
+
+    @callback
+    def _async_record_result(self, error):
+        """Przekazuje wynik zapytania bezpiecznikowi (error None - sukces)."""
+        state = self._breaker.state
+        failing_since = self._breaker.failing_since
+        failures = self._breaker.failures
+        now = time.monotonic()
+        if error is None:
+            self._breaker.record_success(now)
+        else:
+            self._breaker.record_failure(error, now)
+        self._async_breaker_changed(state, failing_since, failures)
+
+    @callback
+    def _async_breaker_changed(self, old_state, failing_since=None, failures=0):
+        """Loguje zmianę stanu bezpiecznika (jedna linia) i powiadamia encje o dostępności."""
+        breaker = self._breaker
+        if breaker.state == old_state:
+            return
+        if breaker.state == STATE_OPEN and old_state == STATE_CLOSED:
+            _LOGGER.warning("Hub %s unavailable after %d failed requests (last error: %s), retrying in %.1f s",
+                            self._hub_name, breaker.failures, breaker.last_error, breaker.retry_in)
+        elif breaker.state == STATE_OPEN:
+            _LOGGER.debug("Hub %s still unavailable (%s), retrying in %.1f s",
+                          self._hub_name, breaker.last_error, breaker.retry_in)
+        elif breaker.state == STATE_HALF_OPEN:
+            _LOGGER.debug("Hub %s: sending a trial request", self._hub_name)
+        elif breaker.state == STATE_CLOSED:
+            _LOGGER.warning("Hub %s available again after %.0f s (%d failed requests)",
+                            self._hub_name, time.monotonic() - failing_since if failing_since else 0, failures)
+        if (old_state == STATE_CLOSED) != breaker.closed:
+            # Jedno rozesłanie na bufor - encje same sprawdzą dostępność
+            buffers = dict.fromkeys(buffer for group in self._groups.values() for buffer in group)
+            for buffer in buffers:
+                buffer.async_update_listeners()
+            for update_callback in list(self._availability_listeners):
+                update_callback()
+
+    @callback
+    def async_add_availability_listener(self, update_callback):
+        """Rejestruje callback wołany po zmianie dostępności huba; zwraca funkcję odłączającą."""
+        self._availability_listeners.append(update_callback)
+
+        @callback
+        def remove_listener():
+            if update_callback in self._availability_listeners:
+                self._availability_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @property
+    def queue_depth(self):
+        """Return the number of requests waiting for the hub."""
+        # Zapytanie przesunięte do wyższego priorytetu ma w kopcu dwa wpisy
+        return len({id(request) for _, _, request in self._queue if not request.started})
+
+    def get_queue_stats(self):
+        """Zwraca głębokość kolejki i czasy oczekiwania (w ms) dla każdego priorytetu."""
+        stats = {'queue_depth': self.queue_depth, 'max_queue_depth': self._max_depth,
+                 'timeouts': self._timeouts, 'breaker_state': self._breaker.state,
+                 'breaker_trips': self._breaker.trips, 'rejected_requests': self._breaker.rejected}
+        for priority, (count, total, longest) in self._wait_stats.items():
+            name = PRIORITY_NAMES.get(priority, priority)
+            stats['{}_requests'.format(name)] = count
+            stats['{}_avg_wait_ms'.format(name)] = round(total / count * 1000, 1) if count else 0
+            stats['{}_max_wait_ms'.format(name)] = round(longest * 1000, 1)
+        return stats
+
+    def get_poll_stats(self):
+        """Zwraca liczbę cykli, pominięte takty i czasy cykli (w ms) dla każdego interwału."""
+        stats = {}
+        for interval, (cycles, overruns, total, longest, last) in self._cycle_stats.items():
+            # Klucz w sekundach, np. '5s' - używany też w nazwach atrybutów sensora huba
+            stats['{:g}s'.format(interval.total_seconds())] = {
+                'cycles': cycles,
+                'overruns': overruns,
+                'avg_duration_ms': round(total / cycles * 1000, 1) if cycles else 0,
+                'max_duration_ms': round(longest * 1000, 1),
+                'last_duration_ms': round(last * 1000, 1),
+            }
+        return stats
+
+    @callback
+    def async_handle_stop(self, event):
+        """Stop the coordinator when Home Assistant stops."""
+        self.async_stop()
+
+    @callback
+    def async_stop(self):
+        """Zatrzymuje timery, trwające cykle i zapytania czekające w kolejce."""
+        for cancel in self._timers.values():
+            cancel()
+        self._timers.clear()
+        self._groups.clear()
+        for cycle in self._cycles.values():
+            cycle.cancel()
+        self._cycles.clear()
+        for _, _, request in self._queue:
+            request.future.cancel()
+        self._queue.clear()
+        if self._worker is not None:
+            self._worker.cancel()
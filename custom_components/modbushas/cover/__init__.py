@@ -0,0 +1,4 @@
+"""Modbus HAS Cover integration."""
+from .cover import async_setup_platform
+
+__all__ = ["async_setup_platform"]
@@ -0,0 +1,598 @@
+"""
+Support for Modbus covers (blinds, shutters, gates driven by a PLC).
+
+For more details about this platform, please refer to the documentation at
+https://home-assistant.io/components/cover.modbus/
+"""
+import logging
+import voluptuous as vol
+import asyncio
+import datetime
+import time
+
+from homeassistant.core import callback
+
+from homeassistant.components.modbus.const import DEFAULT_SLAVE
+
+from homeassistant.const import (
+    CONF_DEVICE_CLASS,
+    CONF_NAME,
+    CONF_SCAN_INTERVAL,
+    CONF_SLAVE,
+    CONF_UNIQUE_ID,
+    EVENT_HOMEASSISTANT_STOP,
+)
+
+from homeassistant.components.cover import (
+    ATTR_POSITION,
+    CoverEntity,
+    CoverEntityFeature,
+)
+
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+
+from .. import DOMAIN
+from ..buffer import (
+    ModbusCoilBuffer,
+    ModbusRegisterBuffer,
+    async_get_buffer,
+    scan_interval_to_timedelta,
+)
+from ..decoder import compile_decoder
+from ..entity import ModbusBufferEntity, async_add_buffer_entities
+
+_LOGGER = logging.getLogger(__name__)
+
+# Definiuję własne stałe, ponieważ nie są już dostępne w modbus.const
+CONF_COVERS = "covers"
+# Sterowanie rejestrem: wartości poleceń otwarcia / zamknięcia / zatrzymania
+CONF_REGISTER = "register"
+CONF_COMMAND_OPEN = "command_open"
+CONF_COMMAND_CLOSE = "command_close"
+CONF_COMMAND_STOP = "command_stop"
+# Sterowanie coilami: coil ruchu w górę i w dół (zatrzymanie - oba wyłączone)
+CONF_OPEN_COIL = "open_coil"
+CONF_CLOSE_COIL = "close_coil"
+# Sprzężenie zwrotne z PLC: położenie (0-100) i krańcówki (wartość != 0 - osiągnięta)
+CONF_POSITION_REGISTER = "position_register"
+CONF_OPENED_REGISTER = "opened_register"
+CONF_CLOSED_REGISTER = "closed_register"
+# Skalibrowany czas pełnego przejazdu (w sekundach), osobno w górę i w dół
+CONF_TRAVEL_TIME = "travel_time"
+CONF_TRAVEL_TIME_OPEN = "travel_time_open"
+CONF_TRAVEL_TIME_CLOSE = "travel_time_close"
+
+# Maksymalna dziura (w adresach) łączona w jeden odczyt blokowy
+CONF_MAX_GAP = "max_gap"
+# Okno (w sekundach), w którym polecenia rolet łączone są w jedno zapytanie FC15 / FC16
+CONF_WRITE_WINDOW = "write_window"
+# Odpytywanie adaptacyjne: po zmianie lub poleceniu blok odpytywany jest co
+# min_scan_interval, a gdy milczy - coraz rzadziej, aż do scan_interval
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+
+DEFAULT_TRAVEL_TIME = 30
+# Takt wspólny dla wszystkich poruszających się rolet
+MOTION_TICK = datetime.timedelta(seconds=1)
+DATA_COVER_MOTION = "cover_motion"
+
+COVERS_SCHEMA = vol.All(
+    cv.has_at_least_one_key(CONF_REGISTER, CONF_OPEN_COIL),
+    vol.Schema({
+        vol.Required(CONF_NAME): cv.string,
+        vol.Optional(CONF_SLAVE): cv.positive_int,
+        vol.Optional(CONF_REGISTER): cv.positive_int,
+        vol.Optional(CONF_COMMAND_OPEN, default=1): cv.positive_int,
+        vol.Optional(CONF_COMMAND_CLOSE, default=2): cv.positive_int,
+        vol.Optional(CONF_COMMAND_STOP, default=0): cv.positive_int,
+        vol.Inclusive(CONF_OPEN_COIL, "coils"): cv.positive_int,
+        vol.Inclusive(CONF_CLOSE_COIL, "coils"): cv.positive_int,
+        vol.Optional(CONF_POSITION_REGISTER): cv.positive_int,
+        vol.Optional(CONF_OPENED_REGISTER): cv.positive_int,
+        vol.Optional(CONF_CLOSED_REGISTER): cv.positive_int,
+        vol.Optional(CONF_TRAVEL_TIME, default=DEFAULT_TRAVEL_TIME): vol.Any(cv.positive_int, cv.positive_float),
+        vol.Optional(CONF_TRAVEL_TIME_OPEN): vol.Any(cv.positive_int, cv.positive_float),
+        vol.Optional(CONF_TRAVEL_TIME_CLOSE): vol.Any(cv.positive_int, cv.positive_float),
+        vol.Optional(CONF_DEVICE_CLASS): cv.string,
+        vol.Optional(CONF_SCAN_INTERVAL): vol.Any(cv.positive_int, cv.positive_float),
+        vol.Optional(CONF_UNIQUE_ID): cv.string
+    }))
+
+# Tworzę własny schemat zamiast importować z cover
+PLATFORM_SCHEMA = vol.Schema({
+    vol.Required("platform"): "modbushas",
+    vol.Optional("hub"): cv.string,
+    vol.Optional("scan_interval"): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Optional(CONF_MAX_GAP): cv.positive_int,
+    vol.Optional(CONF_MIN_SCAN_INTERVAL): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Optional(CONF_WRITE_WINDOW): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Required(CONF_COVERS): [COVERS_SCHEMA]
+})
+
+
+@callback
+def async_get_motion(hass):
+    """Zwraca (lub tworzy) wspólny takt ruchu rolet."""
+    motion = hass.data.setdefault(DOMAIN, {}).get(DATA_COVER_MOTION)
+    if motion is None:
+        motion = CoverMotion(hass)
+        hass.data[DOMAIN][DATA_COVER_MOTION] = motion
+        # Przy zatrzymaniu HA nie zostawiamy aktywnego taktu
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, motion.async_handle_stop)
+    return motion
+
+
+class CoverMotion():
+    """
+    Jeden takt dla wszystkich poruszających się rolet.
+
+    Takt działa tylko wtedy, gdy któraś roleta jest w ruchu. W każdym takcie
+    położenie każdej rolety szacowane jest z czasu przejazdu, a rejestry
+    sprzężenia zwrotnego (położenie, krańcówki) wszystkich poruszających się
+    rolet odczytywane są blokowo - dziesięć rolet to jeden timer i jeden
+    odczyt bloku na urządzenie.
+    """
+
+    def __init__(self, hass):
+        self._hass = hass
+        self._moving = set()
+        self._cancel_tick = None
+        self._refresh = None
+        self.ticks = 0
+
+    @property
+    def active(self):
+        """Return True while the shared tick is running."""
+        return self._cancel_tick is not None
+
+    @callback
+    def async_start(self, cover):
+        """Dodaje roletę do taktu (start taktu przy pierwszej poruszającej się)."""
+        self._moving.add(cover)
+        if self._cancel_tick is None:
+            _LOGGER.debug("Starting cover motion tick")
+            self._cancel_tick = async_track_time_interval(self._hass, self._async_tick, MOTION_TICK)
+
+    @callback
+    def async_stop(self, cover):
+        """Usuwa roletę z taktu (zatrzymanie taktu, gdy żadna się nie porusza)."""
+        self._moving.discard(cover)
+        if not self._moving and self._cancel_tick is not None:
+            _LOGGER.debug("Stopping cover motion tick")
+            self._cancel_tick()
+            self._cancel_tick = None
+
+    @callback
+    def _async_tick(self, now=None):
+        self.ticks += 1
+        monotonic = time.monotonic()
+        for cover in list(self._moving):
+            cover.async_motion_tick(monotonic)
+
+        # Poprzedni odczyt jeszcze trwa - nie dokładamy kolejnego
+        if self._refresh is not None and not self._refresh.done():
+            return
+        reads = {}
+        for cover in self._moving:
+            for buffer, addresses in cover.feedback_addresses():
+                reads.setdefault(buffer, set()).update(addresses)
+        if reads:
+            self._refresh = self._hass.async_create_task(self._async_refresh(reads))
+
+    async def _async_refresh(self, reads):
+        """Odczytuje blokowo sprzężenie zwrotne poruszających się rolet."""
+        await asyncio.gather(*(buffer.async_refresh_addresses(addresses)
+                               for buffer, addresses in reads.items()))
+
+    @callback
+    def async_handle_stop(self, event=None):
+        self._moving.clear()
+        if self._cancel_tick is not None:
+            self._cancel_tick()
+            self._cancel_tick = None
+
+
+def _create_covers(hass, config):
+    """
+    Tworzy encje rolet i zwraca (encje, bufory do primingu).
+
+    Rejestry sprzężenia zwrotnego trafiają do wspólnego bufora rejestrów
+    urządzenia, polecenia - do okna zapisu bufora rejestrów lub coili,
+    więc polecenia kilku rolet wydane naraz idą jednym zapytaniem.
+    """
+    covers = []
+    buffers = []
+    scan_interval = config.get("scan_interval")
+    hub_name = config.get("hub", "fatek")
+    scan_interval_timedelta = scan_interval_to_timedelta(scan_interval)
+    options = {
+        "max_gap": config.get(CONF_MAX_GAP),
+        "min_interval": config.get(CONF_MIN_SCAN_INTERVAL),
+    }
+    # Okno zapisu należy do encji tej platformy, nie do wspólnego bufora
+    write_window = config.get(CONF_WRITE_WINDOW)
+    motion = async_get_motion(hass)
+
+    _LOGGER.debug("Cover scan interval: %s (type: %s), hub: %s", scan_interval, type(scan_interval), hub_name)
+
+    for cover in config.get(CONF_COVERS, ()):
+        _LOGGER.debug("Adding cover: %s, register: %s, coils: %s/%s", cover.get(CONF_NAME), cover.get(CONF_REGISTER),
+                      cover.get(CONF_OPEN_COIL), cover.get(CONF_CLOSE_COIL))
+        slave = cover.get(CONF_SLAVE, DEFAULT_SLAVE)
+        buffer = async_get_buffer(hass, ModbusRegisterBuffer, hub_name, slave, scan_interval_timedelta, **options)
+        coil_buffer = None
+        if cover.get(CONF_OPEN_COIL) is not None:
+            coil_buffer = async_get_buffer(hass, ModbusCoilBuffer, hub_name, slave,
+                                           scan_interval_timedelta, **options)
+        travel_time = cover.get(CONF_TRAVEL_TIME, DEFAULT_TRAVEL_TIME)
+        entity = ModbusHASCover(
+            cover.get(CONF_NAME),
+            motion,
+            buffer,
+            cover.get(CONF_REGISTER),
+            (cover.get(CONF_COMMAND_OPEN, 1), cover.get(CONF_COMMAND_CLOSE, 2), cover.get(CONF_COMMAND_STOP, 0)),
+            coil_buffer,
+            cover.get(CONF_OPEN_COIL),
+            cover.get(CONF_CLOSE_COIL),
+            cover.get(CONF_POSITION_REGISTER),
+            cover.get(CONF_OPENED_REGISTER),
+            cover.get(CONF_CLOSED_REGISTER),
+            cover.get(CONF_TRAVEL_TIME_OPEN, travel_time),
+            cover.get(CONF_TRAVEL_TIME_CLOSE, travel_time),
+            cover.get(CONF_DEVICE_CLASS),
+            cover.get(CONF_UNIQUE_ID),
+            scan_interval_to_timedelta(cover.get(CONF_SCAN_INTERVAL, scan_interval)),
+            write_window)
+        covers.append(entity)
+        if entity.has_feedback:
+            buffers.append(buffer)
+
+    return covers, buffers
+
+
+async def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
+    """Setup Modbus covers."""
+    _LOGGER.info("Setting up Modbus Cover platform - config: %s", config)
+
+    # Użyj discovery_info jeśli config jest pusty
+    if not config and discovery_info:
+        config = discovery_info
+        _LOGGER.info("Using discovery_info as config")
+
+    covers, buffers = _create_covers(hass, config)
+    _LOGGER.info("Added %d Modbus covers", len(covers))
+    await async_add_buffer_entities(hass, async_add_devices, covers, buffers, "cover")
+
+
+class ModbusHASCover(ModbusBufferEntity, CoverEntity):
+    """Representation of a PLC-driven Modbus cover."""
+    _attr_supported_features = (CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE
+                                | CoverEntityFeature.STOP | CoverEntityFeature.SET_POSITION)
+
+    def __init__(self, name, motion, buffer, register, commands, coil_buffer, open_coil, close_coil,
+                 position_register, opened_register, closed_register, travel_time_open, travel_time_close,
+                 device_class=None, unique_id=None, scan_interval=None, write_window=None):
+        """Initialize the cover."""
+        self._name = name
+        self._motion = motion
+        self._buffer = buffer
+        self._write_window = write_window
+        self._register = int(register) if register is not None else None
+        self._command_open, self._command_close, self._command_stop = commands
+        self._coil_buffer = coil_buffer
+        self._open_coil = open_coil
+        self._close_coil = close_coil
+        self._travel_time = {1: float(travel_time_open), -1: float(travel_time_close)}
+        self._attr_device_class = device_class
+
+        # Położenie 0-100 (None - nieznane, np. po starcie bez sprzężenia zwrotnego)
+        self._position = None
+        # Ruch: kierunek (1 - otwieranie, -1 - zamykanie, 0 - stoi), cel i punkt startu szacowania
+        self._direction = 0
+        self._target = None
+        self._start_position = None
+        self._started_at = None
+        # Przejazd z nieznanego położenia do końca kalibruje szacowanie -
+        # do jego zakończenia położenie pozostaje nieznane
+        self._calibrating = False
+        # Polecenie stop po dojechaniu do celu czeka na potwierdzenie (ponawiane w takcie)
+        self._stop_pending = False
+        self._stop_failed = False
+        self._stop_task = None
+
+        # Sprzężenie zwrotne odczytywane jest z bloku rejestrów, wspólnego z innymi encjami
+        self._position_decoder = None
+        self._opened_decoder = None
+        self._closed_decoder = None
+        if position_register is not None:
+            self._position_decoder = buffer.add_decoder(compile_decoder(int(position_register)), scan_interval)
+        if opened_register is not None:
+            self._opened_decoder = buffer.add_decoder(compile_decoder(int(opened_register)), scan_interval)
+        if closed_register is not None:
+            self._closed_decoder = buffer.add_decoder(compile_decoder(int(closed_register)), scan_interval)
+        # Bez sprzężenia zwrotnego stan wynika tylko z poleceń i czasu przejazdu
+        self._buffer_addresses = tuple(self._feedback_registers())
+
+        # Generujemy unikalny ID dla encji - używamy podany lub generujemy domyślny
+        if unique_id:
+            self._attr_unique_id = unique_id
+        else:
+            self._attr_unique_id = f"modbushas_cover_{name}_{register if register is not None else open_coil}"
+
+        _LOGGER.debug("ModbusHASCover initialized: name=%s, register=%s, coils=%s/%s, feedback=%s, unique_id=%s",
+                      name, register, open_coil, close_coil, self._feedback_registers(), self._attr_unique_id)
+
+    def _feedback_decoders(self):
+        return [decoder for decoder in (self._position_decoder, self._opened_decoder, self._closed_decoder)
+                if decoder is not None]
+
+    def _feedback_registers(self):
+        return [decoder.address for decoder in self._feedback_decoders()]
+
+    @property
+    def has_feedback(self):
+        """Return True if the PLC reports position or end stops."""
+        return bool(self._feedback_decoders())
+
+    def feedback_addresses(self):
+        """Return (buffer, registers) read on every motion tick while moving."""
+        registers = self._feedback_registers()
+        return [(self._buffer, registers)] if registers else []
+
+    @property
+    def _state(self):
+        """Return the position as the entity state (None - unknown)."""
+        return self._position
+
+    async def async_will_remove_from_hass(self):
+        """Leave the shared motion tick."""
+        self._motion.async_stop(self)
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _update_from_buffer(self):
+        """Copy the position, end stops and availability from the buffer; return True if they changed."""
+        available = self._buffer_available()
+        changed = available != self._attr_available
+        self._attr_available = available
+        if not self.has_feedback:
+            return changed
+
+        stale = any(self._buffer.is_stale(register) for register in self._buffer_addresses)
+        if stale != self._stale:
+            self._stale = stale
+            changed = True
+
+        position = None
+        if self._position_decoder is not None:
+            value = self._buffer.get_decoded_value(self._position_decoder)
+            if value is not None:
+                position = max(0, min(100, value))
+        end_stop = self._end_stop()
+        if self._direction:
+            # Krańcówka opuszczanego końca bywa aktywna jeszcze chwilę po starcie -
+            # ruch kończy tylko krańcówka w kierunku jazdy
+            if end_stop is not None and end_stop == (100 if self._direction > 0 else 0):
+                _LOGGER.debug("Cover %s reached end stop at %s", self._name, end_stop)
+                self._async_end_motion()
+                position = end_stop
+            elif position is not None:
+                # Szacowanie w kolejnych taktach startuje od odczytanego położenia
+                self._start_position = position
+                self._started_at = time.monotonic()
+                self._calibrating = False
+        elif end_stop is not None:
+            # Krańcówka ma pierwszeństwo przed odczytanym położeniem
+            position = end_stop
+        if position is None or position == self._position:
+            return changed
+        self._position = position
+        return True
+
+    def _end_stop(self):
+        """Return 0 or 100 if the closed or opened end stop is active, None otherwise."""
+        if self._closed_decoder is not None and self._buffer.get_decoded_value(self._closed_decoder):
+            return 0
+        if self._opened_decoder is not None and self._buffer.get_decoded_value(self._opened_decoder):
+            return 100
+        return None
+
+    def _drive_available(self):
+        if self._register is not None:
+            return self._buffer.available
+        return self._coil_buffer.available
+
+    def _buffer_available(self):
+        """Return True if the feedback registers and the drive are available."""
+        # Niepotwierdzony stop - napęd może nadal jechać
+        return super()._buffer_available() and self._drive_available() and not self._stop_failed
+
+    @callback
+    def async_motion_tick(self, now):
+        """Estimate the position from the travel time on the shared motion tick."""
+        if self._stop_pending and not self._direction:
+            # Stop po dojechaniu do celu jeszcze niepotwierdzony - ponawiamy co takt
+            self._async_send_stop()
+            return
+        if not self._direction:
+            return
+        elapsed = now - self._started_at
+        position = self._estimate(now)
+        target = self._target
+        if (self._direction > 0 and position >= target) or (self._direction < 0 and position <= target):
+            _LOGGER.debug("Cover %s reached %s after %.1f s", self._name, target, elapsed)
+            self._position = target
+            # Ruch do końca z krańcówką zatrzymuje PLC, w pozostałych przypadkach - polecenie stop
+            end_decoder = {0: self._closed_decoder, 100: self._opened_decoder}.get(target)
+            self._stop_pending = end_decoder is None
+            self._async_end_motion()
+            if self._stop_pending:
+                self._async_send_stop()
+        elif not self._calibrating:
+            self._position = int(round(position))
+        self.async_write_ha_state()
+
+    @callback
+    def _async_send_stop(self):
+        if self._stop_task is None or self._stop_task.done():
+            self._stop_task = self.hass.async_create_task(self._async_stop_drive())
+
+    async def _async_stop_drive(self):
+        """Send the stop after reaching the target; mark the cover unavailable until it is confirmed."""
+        try:
+            stopped = await self._async_drive(0)
+        except Exception as e:
+            _LOGGER.debug("Cover %s: stop command failed: %s", self._name, e)
+            stopped = False
+        if not self._stop_pending:
+            # W międzyczasie przyszło nowe polecenie
+            return
+        if stopped:
+            self._stop_pending = False
+            self._motion.async_stop(self)
+            if self._stop_failed:
+                _LOGGER.warning("Cover %s: stop confirmed", self._name)
+                self._stop_failed = False
+                self._update_from_buffer()
+                self.async_write_ha_state()
+            return
+        if not self._stop_failed:
+            _LOGGER.error("Cover %s: stop at position %s not confirmed, the drive may still be running; retrying",
+                          self._name, self._position)
+            self._stop_failed = True
+            self._attr_available = False
+            self.async_write_ha_state()
+
+    def _estimate(self, now):
+        """Return the position estimated from the calibrated travel time."""
+        elapsed = now - self._started_at
+        position = self._start_position + self._direction * 100 * elapsed / self._travel_time[self._direction]
+        return max(0, min(100, position))
+
+    @callback
+    def _async_end_motion(self):
+        self._direction = 0
+        self._target = None
+        self._calibrating = False
+        if not self._stop_pending:
+            # Z niepotwierdzonym stopem roleta zostaje w takcie (ponawianie stopu)
+            self._motion.async_stop(self)
+
+    @property
+    def name(self):
+        """Return the name of the cover."""
+        return self._name
+
+    @property
+    def assumed_state(self):
+        """Return True if the position is only estimated from travel time."""
+        return not self.has_feedback
+
+    @property
+    def current_cover_position(self):
+        """Return the current position of the cover."""
+        return self._position
+
+    @property
+    def is_closed(self):
+        """Return if the cover is closed."""
+        if self._position is None:
+            return None
+        return self._position == 0
+
+    @property
+    def is_closing(self):
+        """Return if the cover is closing."""
+        return self._direction < 0
+
+    @property
+    def is_opening(self):
+        """Return if the cover is opening."""
+        return self._direction > 0
+
+    async def async_open_cover(self, **kwargs):
+        """Open the cover."""
+        await self._async_move_to(100)
+
+    async def async_close_cover(self, **kwargs):
+        """Close the cover."""
+        await self._async_move_to(0)
+
+    async def async_set_cover_position(self, **kwargs):
+        """Move the cover to a specific position."""
+        position = kwargs.get(ATTR_POSITION)
+        if self._position is None and position not in (0, 100):
+            _LOGGER.warning("Cover %s: position unknown, open or close it fully first", self._name)
+            return
+        await self._async_move_to(position)
+
+    async def async_stop_cover(self, **kwargs):
+        """Stop the cover."""
+        if self._direction and not self._calibrating:
+            # Położenie z chwili zatrzymania, nie z ostatniego taktu
+            self._position = int(round(self._estimate(time.monotonic())))
+        # Polecenie użytkownika zastępuje ponawiany stop
+        self._stop_pending = self._stop_failed = False
+        self._async_end_motion()
+        await self._async_drive(0)
+        self.async_write_ha_state()
+
+    async def _async_move_to(self, target):
+        if target == self._position and not self._direction:
+            return
+        # Nieznane położenie - pełny przejazd od przeciwnego końca kalibruje
+        # szacowanie; pośrednie położenia nie są wtedy publikowane
+        start = self._position
+        calibrating = start is None
+        if calibrating:
+            start = 0 if target == 100 else 100
+        direction = 1 if target > start else -1
+        if self._direction and self._direction != direction:
+            # Zmiana kierunku - najpierw zatrzymanie napędu
+            await self._async_drive(0)
+        if not await self._async_drive(direction):
+            self.async_write_ha_state()
+            return
+        self._stop_pending = self._stop_failed = False
+        self._calibrating = calibrating
+        self._direction = direction
+        self._target = target
+        self._start_position = start
+        self._started_at = time.monotonic()
+        self._motion.async_start(self)
+        _LOGGER.debug("Cover %s moving %s from %s to %s", self._name,
+                      "up" if direction > 0 else "down", start, target)
+        self.async_write_ha_state()
+
+    async def _async_drive(self, direction):
+        """Send the open (1), close (-1) or stop (0) command; return True if committed."""
+        if self._register is not None:
+            command = {1: self._command_open, -1: self._command_close, 0: self._command_stop}[direction]
+            _LOGGER.debug("Async writing cover %s: register %s = %s", self._name, self._register, command)
+            # Polecenia rolet wydane naraz idą jednym zapytaniem FC16 (okno zapisu)
+            result = await self._buffer.async_write_registers(self._register, [command],
+                                                              write_window=self._write_window)
+        else:
+            _LOGGER.debug("Async writing cover %s: coils %s/%s = %s", self._name,
+                          self._open_coil, self._close_coil, direction)
+            # Oba coile w jednym oknie zapisu - wyłączenie jednego i włączenie drugiego
+            # trafiają do PLC razem (FC15 dla sąsiednich coili)
+            results = await asyncio.gather(
+                self._coil_buffer.async_write_coil(self._open_coil, direction > 0, verify_after_write=False,
+                                                   write_window=self._write_window),
+                self._coil_buffer.async_write_coil(self._close_coil, direction < 0, verify_after_write=False,
+                                                   write_window=self._write_window))
+            result = all(results)
+        if not result and not self._stop_failed:
+            # Ponawiany stop zgłosił już błąd - nie powtarzamy go co takt
+            _LOGGER.warning("Cover %s: command %s not confirmed", self._name, direction)
+        return result
+
+    async def async_update(self):
+        """Async update the state of the cover."""
+        _LOGGER.debug("Async updating cover state: %s", self._name)
+        if self.has_feedback:
+            await self._buffer.async_refresh_addresses(self._feedback_registers())
+        self._update_from_buffer()
+
+        _LOGGER.debug("Cover %s async updated position: %s (age %s s)", self._name, self._position, self.value_age)
@@ -0,0 +1,224 @@
+"""
+Register data types and decoders for Modbus HAS platforms.
+
+Wspólna warstwa typów danych dla wszystkich platform opartych na rejestrach:
+liczby całkowite 16/32/64 bit, float 16/32/64, napisy i pola bitowe,
+w dowolnej kolejności bajtów (w rejestrze) i słów (między rejestrami).
+
+Dekoder kompilowany jest raz, przy konfiguracji encji: format struct,
+kolejność bajtów i słów, skala, offset i precyzja. Po każdym odczycie bloku
+bufor dekoduje wszystkie wartości bloku w jednym przebiegu - obraz procesu
+zamieniany jest na bajty raz (widok BE i LE), a każdy dekoder wykonuje
+jedno struct.unpack_from pod swoim offsetem. Ten sam dekoder koduje
+wartości do zapisu (encode).
+"""
+import logging
+import math
+import struct
+import sys
+from array import array
+
+_LOGGER = logging.getLogger(__name__)
+
+# Kolejność słów: big - starsze słowo pod niższym adresem,
+# little - młodsze słowo pierwsze (dotychczasowe zachowanie sensorów)
+WORD_ORDER_BIG = "big"
+WORD_ORDER_LITTLE = "little"
+
+# Kolejność bajtów w rejestrze: big - standard Modbus, little - bajty zamienione
+BYTE_ORDER_BIG = "big"
+BYTE_ORDER_LITTLE = "little"
+
+DATA_TYPE_INT16 = "int16"
+DATA_TYPE_UINT16 = "uint16"
+DATA_TYPE_INT32 = "int32"
+DATA_TYPE_UINT32 = "uint32"
+DATA_TYPE_INT64 = "int64"
+DATA_TYPE_UINT64 = "uint64"
+DATA_TYPE_FLOAT16 = "float16"
+DATA_TYPE_FLOAT32 = "float32"
+DATA_TYPE_FLOAT64 = "float64"
+DATA_TYPE_STRING = "string"
+DATA_TYPE_BITFIELD = "bitfield"
+# Typy bez rozmiaru (jak w climate.py) - rozmiar wynika z liczby rejestrów
+DATA_TYPE_INT = "int"
+DATA_TYPE_UINT = "uint"
+DATA_TYPE_FLOAT = "float"
+
+# Typ -> (format struct, liczba rejestrów)
+DATA_TYPES = {
+    DATA_TYPE_INT16: ("h", 1),
+    DATA_TYPE_UINT16: ("H", 1),
+    DATA_TYPE_INT32: ("i", 2),
+    DATA_TYPE_UINT32: ("I", 2),
+    DATA_TYPE_INT64: ("q", 4),
+    DATA_TYPE_UINT64: ("Q", 4),
+    DATA_TYPE_FLOAT16: ("e", 1),
+    DATA_TYPE_FLOAT32: ("f", 2),
+    DATA_TYPE_FLOAT64: ("d", 4),
+}
+
+# Typ bez rozmiaru -> {liczba rejestrów: typ}
+SIZED_DATA_TYPES = {
+    DATA_TYPE_INT: {1: DATA_TYPE_INT16, 2: DATA_TYPE_INT32, 4: DATA_TYPE_INT64},
+    DATA_TYPE_UINT: {1: DATA_TYPE_UINT16, 2: DATA_TYPE_UINT32, 4: DATA_TYPE_UINT64},
+    DATA_TYPE_FLOAT: {1: DATA_TYPE_FLOAT16, 2: DATA_TYPE_FLOAT32, 4: DATA_TYPE_FLOAT64},
+}
+
+DATA_TYPE_NAMES = list(DATA_TYPES) + [DATA_TYPE_STRING, DATA_TYPE_BITFIELD] + list(SIZED_DATA_TYPES)
+
+# Indeksy widoków zwracanych przez block_views()
+VIEW_BE = 0
+VIEW_LE = 1
+
+
+def block_views(image):
+    """
+    Zwraca (be, le) - bajty obrazu rejestrów w dwóch układach.
+
+    be: każdy rejestr big-endian, rejestry po kolei.
+    le: każdy rejestr little-endian, rejestry po kolei.
+    Każdą kombinację kolejności bajtów i słów czytamy jednym z widoków
+    formatem '>' (starsze słowo pierwsze) lub '<' (młodsze słowo pierwsze).
+    """
+    native = image.tobytes()
+    swapped = array('H', image)
+    swapped.byteswap()
+    swapped = swapped.tobytes()
+    if sys.byteorder == "little":
+        return swapped, native
+    return native, swapped
+
+
+def registers_from_view(data, view):
+    """Odwrotność block_views(): zamienia bajty widoku na listę rejestrów."""
+    registers = array('H', data)
+    if (view == VIEW_BE) == (sys.byteorder == "little"):
+        registers.byteswap()
+    return registers.tolist()
+
+
+class RegisterDecoder():
+    """Precompiled decoder (and encoder) of one value in a register block."""
+
+    def __init__(self, address, count, fmt, word_order=WORD_ORDER_LITTLE,
+                 scale=1.0, offset=0.0, precision=None, byte_order=BYTE_ORDER_BIG,
+                 kind=None, bit=0, bits=1):
+        self.address = address
+        self.count = count
+        big = word_order == WORD_ORDER_BIG
+        self._struct = struct.Struct((">" if big else "<") + fmt)
+        # ABCD i DCBA czytamy z widoku BE, CDAB i BADC z widoku LE
+        self._view = VIEW_BE if big == (byte_order == BYTE_ORDER_BIG) else VIEW_LE
+        self._big = big
+        # Format bez typu struct (np. 3 rejestry) - wartość składana ze słów
+        self._words = kind is None and self._struct.format.count("H") > 1
+        self._kind = kind
+        self._bit = bit
+        self._mask = (1 << bits) - 1
+        self._scale = scale
+        self._offset = offset
+        # Bez skali i offsetu liczby całkowite nie przechodzą przez float
+        # (64-bitowe wartości straciłyby młodsze cyfry)
+        self._identity = scale == 1 and offset == 0
+        # Bez precyzji liczby całkowite zaokrąglane są do int (także po skali),
+        # a float publikowany jest bez zaokrąglania
+        if precision is None and kind is None and fmt[-1] not in "efd":
+            precision = 0
+        self._precision = precision
+        # Ostatnio opublikowana wartość (ustawiana przez bufor)
+        self.value = None
+        # Opcjonalny filtr publikacji (np. DeadbandFilter z filters.py)
+        self.filter = None
+
+    @property
+    def precision(self):
+        """Return the number of decimals of the decoded value (None - not rounded)."""
+        return self._precision
+
+    def decode(self, views, start):
+        """Dekoduje wartość z widoków bloku zaczynającego się od adresu `start`."""
+        data = views[self._view]
+        position = (self.address - start) * 2
+        if self._kind == DATA_TYPE_STRING:
+            raw = self._struct.unpack_from(data, position)[0]
+            return raw.split(b"\x00", 1)[0].decode("ascii", errors="replace").strip()
+        if self._words:
+            words = self._struct.unpack_from(data, position)
+            if not self._big:
+                words = reversed(words)
+            raw = 0
+            for word in words:
+                raw = (raw << 16) | word
+        else:
+            raw = self._struct.unpack_from(data, position)[0]
+        if self._kind == DATA_TYPE_BITFIELD:
+            return (raw >> self._bit) & self._mask
+        value = raw if self._identity else self._scale * raw + self._offset
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        if self._precision is None:
+            return value
+        if self._precision == 0:
+            return int(round(value))
+        return round(value, self._precision)
+
+    def decode_registers(self, registers):
+        """Dekoduje wartość z listy rejestrów zaczynającej się od adresu dekodera."""
+        return self.decode(block_views(array('H', registers)), self.address)
+
+    def encode(self, value):
+        """Koduje wartość (po odwróceniu skali i offsetu) na listę rejestrów do zapisu."""
+        if self._kind is not None or self._words:
+            raise ValueError("Cannot encode {} value".format(self._kind or self._struct.format))
+        raw = value if self._identity else (value - self._offset) / self._scale
+        if self._struct.format[-1] not in "efd":
+            raw = int(round(raw))
+        return registers_from_view(self._struct.pack(raw), self._view)
+
+    def __repr__(self):
+        return "RegisterDecoder({}, {})".format(self.address, self._struct.format)
+
+
+def compile_decoder(address, count=1, signed=False, scale=1.0, offset=0.0, precision=None,
+                    word_order=WORD_ORDER_LITTLE, data_type=None, byte_order=BYTE_ORDER_BIG,
+                    bit=0, bits=1):
+    """
+    Tworzy dekoder wartości zaczynającej się pod adresem `address`.
+
+    Bez `data_type` wartość to liczba całkowita z `count` rejestrów (ze znakiem
+    gdy `signed`) - zgodnie z dotychczasową konfiguracją sensorów. Dla napisów
+    `count` to liczba rejestrów napisu, dla pól bitowych `bit`/`bits` wskazują
+    bity wartości z `count` rejestrów.
+    Bez `precision` liczby całkowite są zaokrąglane do int, a float nie.
+    """
+    if data_type in SIZED_DATA_TYPES:
+        sized = SIZED_DATA_TYPES[data_type].get(count)
+        if sized is None:
+            raise ValueError("No {} type for {} registers".format(data_type, count))
+        data_type = sized
+
+    if data_type is None:
+        if count in (1, 2, 4):
+            fmt = {1: "Hh", 2: "Ii", 4: "Qq"}[count][1 if signed else 0]
+        else:
+            # Brak typu struct - składamy wartość z kolejnych słów bez znaku
+            fmt = "H" * count
+            if signed:
+                _LOGGER.warning("Signed value over %d registers at %s decoded as unsigned", count, address)
+        return RegisterDecoder(address, count, fmt, word_order, scale, offset, precision, byte_order)
+
+    if data_type == DATA_TYPE_STRING:
+        # Znaki idą po kolei niezależnie od kolejności słów
+        return RegisterDecoder(address, count, "{}s".format(2 * count), WORD_ORDER_BIG,
+                               byte_order=byte_order, kind=DATA_TYPE_STRING)
+
+    if data_type == DATA_TYPE_BITFIELD:
+        fmt = {1: "H", 2: "I", 4: "Q"}.get(count)
+        if fmt is None:
+            raise ValueError("Bit field over {} registers is not supported".format(count))
+        return RegisterDecoder(address, count, fmt, word_order, byte_order=byte_order,
+                               kind=DATA_TYPE_BITFIELD, bit=bit, bits=bits)
+
+    fmt, count = DATA_TYPES[data_type]
+    return RegisterDecoder(address, count, fmt, word_order, scale, offset, precision, byte_order)
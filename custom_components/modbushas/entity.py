@@ -0,0 +1,105 @@
+"""
+Shared part of Modbus HAS entities backed by a buffer.
+
+Encje nie odpytują PLC same: stan, dostępność i flaga `stale` pochodzą
+z obrazu procesu wspólnego bufora, a bufor powiadamia encję po odczycie
+bloku, w którym zmieniły się jej adresy.
+"""
+import logging
+
+from homeassistant.core import callback
+
+from .buffer import async_prime_buffers
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_add_buffer_entities(hass, async_add_entities, entities, buffers, platform):
+    """
+    Dodaje encje platformy po jednym równoległym odczycie blokowym ich buforów.
+
+    Encje startują ze stanem z obrazu procesu (warm start), bez pojedynczych
+    odczytów z PLC przy dodawaniu.
+    """
+    await async_prime_buffers(hass, buffers, platform)
+    for entity in entities:
+        entity._update_from_buffer()
+    async_add_entities(entities)
+
+
+class ModbusBufferEntity():
+    """
+    Mixin for entities whose state is read from a shared buffer.
+
+    The entity sets `_buffer` and `_buffer_addresses` (the addresses its state
+    is decoded from) and implements `_state_from_buffer()`, returning the state
+    from the process image or None when there is no data yet.
+    """
+
+    _attr_should_poll = False
+    _attr_available = True
+    _buffer_addresses = ()
+    # Stan z obrazu procesu (None - jeszcze nie odczytany)
+    _state = None
+    # True dopóki stan pochodzi z migawki sprzed restartu lub nie był dawno odświeżony
+    _stale = False
+    # Okno zapisu poleceń encji (None - DEFAULT_WRITE_WINDOW bufora)
+    _write_window = None
+
+    async def async_added_to_hass(self):
+        """Subscribe to buffer updates of the entity addresses."""
+        await super().async_added_to_hass()
+        if not self._buffer_addresses:
+            # Bez adresów stanu encja śledzi tylko dostępność huba (bezpiecznik)
+            self.async_on_remove(self._buffer.async_add_availability_listener(self._handle_buffer_update))
+            return
+
+        # Stan początkowy pochodzi z primingu bufora; odczyt tylko gdy go brak
+        if self._state is None:
+            self.async_schedule_update_ha_state(force_refresh=True)
+
+        # Regularne odświeżanie prowadzi koordynator huba - encja tylko słucha bufora
+        self.async_on_remove(self._buffer.async_add_listener(self._handle_buffer_update, self._buffer_addresses))
+        _LOGGER.debug("%s %s added to hass", type(self).__name__, self._name)
+
+    def _buffer_available(self):
+        """Return True if the hub and the blocks of all entity addresses are available."""
+        return all(self._buffer.is_available(address) for address in self._buffer_addresses)
+
+    @callback
+    def _update_from_buffer(self):
+        """Copy the state and availability from the buffer; return True if they changed."""
+        # Dostępność wynika z bloków adresów i bezpiecznika huba - zmienia się bez odczytu
+        available = self._buffer_available()
+        changed = available != self._attr_available
+        self._attr_available = available
+        state = self._state_from_buffer()
+        if state is None:
+            return changed
+        stale = any(self._buffer.is_stale(address) for address in self._buffer_addresses)
+        if state == self._state and stale == self._stale:
+            return changed
+        self._state = state
+        self._stale = stale
+        return True
+
+    @callback
+    def _handle_buffer_update(self):
+        """Update the entity state from the freshly read buffer."""
+        if self._update_from_buffer():
+            self.async_write_ha_state()
+
+    @property
+    def value_age(self):
+        """Return the age in seconds of the state read from the PLC."""
+        if not self._buffer_addresses:
+            return None
+        age = self._buffer.get_value_age(self._buffer_addresses[0])
+        return round(age, 1) if age is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        # Wiek wartości nie jest atrybutem - stan zapisywany jest tylko po zmianie,
+        # więc atrybut pokazywałby wiek z chwili ostatniej zmiany
+        return {"stale": self._stale}
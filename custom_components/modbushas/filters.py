@@ -0,0 +1,152 @@
+"""
+Publish filters for Modbus HAS register values.
+
+Filtr decyduje, czy nowo zdekodowana wartość zostanie opublikowana encji.
+Działa w buforze, na etapie wykrywania zmian po odczycie bloku - wartość
+odrzucona przez filtr nie powoduje zapisu stanu w HA ani wiersza w recorderze.
+Filtr agregujący pozwala odpytywać rejestr szybko, a publikować rzadziej
+(średnia / min / max / ostatnia wartość z okna).
+"""
+import logging
+import math
+from collections import deque
+
+_LOGGER = logging.getLogger(__name__)
+
+AGGREGATE_MEAN = "mean"
+AGGREGATE_MIN = "min"
+AGGREGATE_MAX = "max"
+AGGREGATE_LAST = "last"
+
+AGGREGATES = {
+    AGGREGATE_MEAN: lambda samples: sum(samples) / len(samples),
+    AGGREGATE_MIN: min,
+    AGGREGATE_MAX: max,
+    AGGREGATE_LAST: lambda samples: samples[-1],
+}
+
+DEFAULT_AGGREGATE_SAMPLES = 120
+
+
+class DeadbandFilter():
+    """
+    Deadband (absolute / percent) with min and max publish intervals.
+
+    Opublikowana wartość nigdy nie odbiega od ostatnio odczytanej o więcej niż
+    `absolute` ani o więcej niż `percent` procent - chyba że od publikacji nie
+    minęło jeszcze `min_interval` sekund. Zmiana mieszcząca się w deadbandzie
+    jest publikowana najpóźniej po `max_interval` sekundach.
+    """
+
+    def __init__(self, absolute=None, percent=None, min_interval=None, max_interval=None):
+        self._absolute = absolute
+        self._percent = percent
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self.published = None
+        self.published_at = None
+        # True gdy odczytana wartość różni się od opublikowanej
+        self.pending = False
+        self.suppressed = 0
+
+    def _significant(self, value):
+        if not isinstance(value, (int, float)) or not isinstance(self.published, (int, float)):
+            return True
+        if self._absolute is None and self._percent is None:
+            return True
+        diff = abs(value - self.published)
+        if self._absolute is not None and diff > self._absolute:
+            return True
+        if self._percent is not None and diff > abs(self.published) * self._percent / 100:
+            return True
+        return False
+
+    def accept(self, value, now):
+        """Sprawdza czy wartość ma zostać opublikowana (i zapamiętuje publikację)."""
+        if self.published_at is None or value is None or self.published is None:
+            return self._publish(value, now)
+        if value == self.published:
+            self.pending = False
+            return False
+        elapsed = now - self.published_at
+        if self._min_interval is None or elapsed >= self._min_interval:
+            if self._significant(value) or (self._max_interval is not None and elapsed >= self._max_interval):
+                return self._publish(value, now)
+        self.pending = True
+        self.suppressed += 1
+        return False
+
+    def _publish(self, value, now):
+        self.published = value
+        self.published_at = now
+        self.pending = False
+        return True
+
+
+class AggregateFilter():
+    """
+    Publishes one aggregate of the samples polled during each window.
+
+    Każdy odczyt bloku dodaje próbkę do pierścienia o stałym rozmiarze
+    (deque z maxlen); po upływie `window` sekund publikowany jest agregat
+    próbek z okna, a pierścień jest czyszczony. Pierwsza próbka jest
+    publikowana od razu, żeby encja nie startowała bez wartości.
+    Opcjonalny `next_filter` (np. DeadbandFilter) filtruje same agregaty.
+
+    Rozmiar pierścienia wynika z okna i najkrótszego odstępu odczytów
+    `interval`; jawne `samples` mniejsze niż liczba odczytów w oknie jest
+    błędem konfiguracji (ValueError) - agregat liczyłby tylko koniec okna.
+    """
+
+    # Agregat potrzebuje każdej próbki - bufor dekoduje blok po każdym odczycie
+    pending = True
+
+    def __init__(self, aggregate, window, samples=None, precision=None, next_filter=None, interval=None):
+        self._aggregate = AGGREGATES[aggregate]
+        self._window = window
+        if interval:
+            # +1 na odczyt wypadający dokładnie na granicy okna
+            needed = math.ceil(window / interval) + 1
+            if samples and samples < needed:
+                raise ValueError("{} samples do not cover a {} s window polled every {} s".format(
+                    samples, window, interval))
+            samples = samples or needed
+        self._samples = deque(maxlen=samples or DEFAULT_AGGREGATE_SAMPLES)
+        # Ostrzeżenie o gubieniu próbek logujemy raz
+        self._overflow_logged = False
+        self._precision = precision
+        self._next = next_filter
+        self._window_start = None
+        self.published = None
+        self.published_at = None
+        self.suppressed = 0
+
+    def accept(self, value, now):
+        """Dodaje próbkę; zwraca True gdy zamknięte okno dało nową wartość do publikacji."""
+        if isinstance(value, (int, float)):
+            if len(self._samples) == self._samples.maxlen and not self._overflow_logged:
+                # Odczyty poza odpytywaniem (polecenia, weryfikacje) mogą przepełnić okno
+                _LOGGER.warning("Aggregate window of %s s holds more than %d samples, oldest are dropped",
+                                self._window, self._samples.maxlen)
+                self._overflow_logged = True
+            self._samples.append(value)
+        if self._window_start is None:
+            self._window_start = now
+            return self._publish(value, now)
+        if now - self._window_start < self._window or not self._samples:
+            self.suppressed += 1
+            return False
+        aggregate = self._aggregate(self._samples)
+        if self._precision is not None:
+            aggregate = round(aggregate, self._precision) if self._precision else int(round(aggregate))
+        self._samples.clear()
+        self._window_start = now
+        return self._publish(aggregate, now)
+
+    def _publish(self, value, now):
+        if self._next is not None and not self._next.accept(value, now):
+            self.suppressed += 1
+            return False
+        self.published = value
+        self.published_at = now
+        return True
@@ -1,4 +1,4 @@
 """Modbus HAS Light integration."""
-from .light import setup_platform
+from .light import async_setup_platform
 
-__all__ = ["setup_platform"]
+__all__ = ["async_setup_platform"]
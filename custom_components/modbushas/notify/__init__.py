@@ -0,0 +1,4 @@
+"""Modbus HAS Notify integration."""
+from .notify import async_get_service
+
+__all__ = ["async_get_service"]
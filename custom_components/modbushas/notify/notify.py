@@ -0,0 +1,146 @@
+"""
+ModbusHAS notification service.
+
+Zapis wartości do rejestrów PLC z automatyzacji, np. nastaw lub tekstów
+wyświetlaczy:
+
+    service: notify.has
+    data:
+      message: ""
+      data:
+        writes:
+          - address: 100
+            values: [1, 2, 3]
+          - [110, 5]
+
+Pojedynczy zapis można nadal podać jako `address` / `value`.
+
+For more details about this platform, please refer to the documentation
+https://home-assistant.io/components/notify/
+"""
+import logging
+import voluptuous as vol
+import asyncio
+
+from homeassistant.components.modbus.const import DEFAULT_SLAVE
+
+from homeassistant.const import CONF_SLAVE
+
+from homeassistant.exceptions import HomeAssistantError
+
+from homeassistant.components.notify import (
+    ATTR_DATA,
+    PLATFORM_SCHEMA,
+    BaseNotificationService,
+)
+
+from homeassistant.helpers import config_validation as cv
+
+from ..buffer import ModbusRegisterBuffer, async_get_buffer
+
+_LOGGER = logging.getLogger(__name__)
+
+# Definiuję własne stałe, ponieważ nie są już dostępne w modbus.const
+CONF_HUB = "hub"
+# Okno (w sekundach), w którym zapisy łączone są w jedno zapytanie FC16
+CONF_WRITE_WINDOW = "write_window"
+
+ATTR_ADDRESS = "address"
+ATTR_VALUE = "value"
+ATTR_VALUES = "values"
+ATTR_WRITES = "writes"
+ATTR_SLAVE = "slave"
+
+# Rejestr 16-bitowy: wartości ujemne zapisywane są w kodzie U2
+REGISTER_VALUE = vol.All(vol.Coerce(int), vol.Range(min=-32768, max=65535))
+
+WRITE_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ADDRESS): vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
+    vol.Required(ATTR_VALUES): vol.Any(REGISTER_VALUE, vol.All([REGISTER_VALUE], vol.Length(min=1))),
+})
+
+
+def _write(value):
+    """Normalizuje zapis ({address, values} albo [address, values]) do (address, [values])."""
+    if isinstance(value, (list, tuple)):
+        if len(value) != 2:
+            raise vol.Invalid("write must be [address, values]")
+        value = {ATTR_ADDRESS: value[0], ATTR_VALUES: value[1]}
+    value = WRITE_SCHEMA(value)
+    values = value[ATTR_VALUES]
+    if not isinstance(values, list):
+        values = [values]
+    return value[ATTR_ADDRESS], [register_value & 0xFFFF for register_value in values]
+
+
+DATA_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_SLAVE): cv.positive_int,
+    vol.Exclusive(ATTR_WRITES, "writes"): [_write],
+    vol.Exclusive(ATTR_ADDRESS, "writes"): vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
+    vol.Optional(ATTR_VALUE): REGISTER_VALUE,
+}, extra=vol.ALLOW_EXTRA)
+
+PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
+    vol.Optional(CONF_HUB): cv.string,
+    vol.Optional(CONF_SLAVE): cv.positive_int,
+    vol.Optional(CONF_WRITE_WINDOW): vol.Any(cv.positive_int, cv.positive_float),
+})
+
+
+async def async_get_service(hass, config, discovery_info=None):
+    """Get the ModbusHAS notification service."""
+    return ModbusHASNotificationService(
+        hass, config.get(CONF_HUB, "fatek"), config.get(CONF_SLAVE, DEFAULT_SLAVE), config.get(CONF_WRITE_WINDOW))
+
+
+class ModbusHASNotificationService(BaseNotificationService):
+    """Implement ModbusHAS notification service."""
+
+    def __init__(self, hass, hub_name, slave, write_window=None):
+        """Initialize the service."""
+        self.hass = hass
+        self._hub_name = hub_name
+        self._slave = slave
+        self._write_window = write_window
+
+    def _get_buffer(self, slave):
+        # Wspólny bufor rejestrów urządzenia - zapisy trafiają do jego okna zapisu
+        # i kolejki huba razem z poleceniami switchy, termostatów i rolet.
+        # Bez interwału (None): async_merge_options go pomija, a bloki bez własnego
+        # interwału odpytywane są co DEFAULT_BUFFER_SCAN_INTERVAL - usługa nie
+        # zmienia taktu odpytywania ustalonego przez encje
+        return async_get_buffer(self.hass, ModbusRegisterBuffer, self._hub_name, slave, None)
+
+    async def async_send_message(self, message="", **kwargs):
+        """
+        Zapisuje listę (adres, wartości) do rejestrów; kończy się po zatwierdzeniu.
+
+        Niepoprawne dane zgłaszają vol.Invalid, niepotwierdzony zapis -
+        HomeAssistantError, więc automatyzacja widzi błąd wywołania usługi.
+
+        Wszystkie zapisy trafiają naraz do okna zapisu bufora, więc sąsiednie
+        adresy (także z innych wywołań w tym samym oknie) idą jednym zapytaniem
+        FC16 - partia nastaw to kilka round-tripów zamiast jednego na rejestr.
+        """
+        # vol.Invalid trafia do wywołującego - HA zgłasza błąd walidacji danych usługi
+        data = DATA_SCHEMA(kwargs.get(ATTR_DATA) or {})
+
+        writes = data.get(ATTR_WRITES)
+        if writes is None:
+            if ATTR_ADDRESS not in data:
+                raise HomeAssistantError("No Modbus writes in notification data: {}".format(kwargs.get(ATTR_DATA)))
+            writes = [(data[ATTR_ADDRESS], [data.get(ATTR_VALUE, 0) & 0xFFFF])]
+
+        slave = data.get(ATTR_SLAVE, self._slave)
+        buffer = self._get_buffer(slave)
+        _LOGGER.debug("Writing %d register ranges to %s/%s", len(writes), self._hub_name, slave)
+        # Okno zapisu usługi dotyczy tylko jej zapisów, nie poleceń encji bufora
+        results = await asyncio.gather(*(buffer.async_write_registers(address, values,
+                                                                      write_window=self._write_window)
+                                         for address, values in writes))
+
+        failed = [address for (address, values), result in zip(writes, results) if not result]
+        if failed:
+            raise HomeAssistantError("Modbus writes to {}/{} not confirmed at addresses {}".format(
+                self._hub_name, slave, failed))
+        _LOGGER.debug("Committed %d register ranges to %s/%s", len(writes), self._hub_name, slave)
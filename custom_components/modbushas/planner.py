@@ -0,0 +1,92 @@
+"""
+Read planner for Modbus HAS buffers.
+
+Dzieli skonfigurowane adresy na niewielką liczbę odczytów blokowych.
+Dwa sąsiednie zakresy są łączone, jeśli dziura między nimi nie przekracza
+progu `max_gap` (koszt odczytu zbędnych adresów jest mniejszy niż koszt
+kolejnego zapytania), a blok mieści się w limicie PDU dla danej funkcji.
+Zapisy są grupowane w ciągłe serie wysyłane jednym zapytaniem.
+"""
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Limity protokołu Modbus dla jednego zapytania odczytu
+MAX_COILS_PER_READ = 2000        # FC1 / FC2
+MAX_REGISTERS_PER_READ = 125     # FC3 / FC4
+
+# Limity protokołu Modbus dla jednego zapytania zapisu
+MAX_COILS_PER_WRITE = 1968       # FC15
+MAX_REGISTERS_PER_WRITE = 123    # FC16
+
+# Domyślny próg dziury: coile są pakowane po 8 w bajcie, więc dziura
+# w coilach jest dużo tańsza niż dziura w rejestrach (2 bajty na rejestr)
+DEFAULT_COIL_MAX_GAP = 256
+DEFAULT_REGISTER_MAX_GAP = 32
+
+
+def merge_spans(spans):
+    """Scala nakładające się zakresy (address, count); zwraca posortowaną listę (start, end)."""
+    merged = []
+    for address, count in sorted(spans):
+        end = address + max(count, 1) - 1
+        if merged and address <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([address, end])
+    return merged
+
+
+def plan_blocks(spans, max_count, max_gap):
+    """
+    Planuje odczyty blokowe dla zakresów (address, count).
+
+    Wartości wielorejestrowe (count > 1) nigdy nie są dzielone między bloki,
+    chyba że sam zakres przekracza limit PDU - wtedy jest dzielony na bloki
+    o rozmiarze limitu. Zwraca listę krotek (start, count).
+    """
+    blocks = []
+    block_start = None
+    block_end = None
+    for start, end in merge_spans(spans):
+        if end - start + 1 > max_count:
+            _LOGGER.error("Span %s-%s exceeds protocol limit of %s per read", start, end, max_count)
+            if block_start is not None:
+                blocks.append((block_start, block_end - block_start + 1))
+            while end - start + 1 > max_count:
+                blocks.append((start, max_count))
+                start += max_count
+            block_start = start
+            block_end = end
+            continue
+        if block_start is not None:
+            gap = start - block_end - 1
+            if gap <= max_gap and end - block_start + 1 <= max_count:
+                block_end = max(block_end, end)
+                continue
+            blocks.append((block_start, block_end - block_start + 1))
+        block_start = start
+        block_end = end
+    if block_start is not None:
+        blocks.append((block_start, block_end - block_start + 1))
+    _LOGGER.debug("Planned %d read blocks: %s", len(blocks), blocks)
+    return blocks
+
+
+def group_contiguous(addresses, max_count):
+    """
+    Grupuje adresy w ciągłe serie do zapisu jednym zapytaniem.
+
+    Dziur nie wypełniamy - zapis nadpisałby adresy, których nikt nie zmieniał.
+    Zwraca listę krotek (start, [adresy]).
+    """
+    runs = []
+    for address in sorted(addresses):
+        if runs:
+            start, members = runs[-1]
+            if address == members[-1] + 1 and len(members) < max_count:
+                members.append(address)
+                continue
+        runs.append((address, [address]))
+    return runs
@@ -1,4 +1,4 @@
 """Modbus HAS Sensor integration."""
-from .sensor import setup_platform
+from .sensor import async_setup_platform
 
-__all__ = ["setup_platform"]
+__all__ = ["async_setup_platform"]
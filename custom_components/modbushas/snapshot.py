@@ -0,0 +1,107 @@
+"""
+Persistent process-image snapshot for Modbus HAS buffers.
+
+Ostatnio odczytane bloki buforów zapisywane są w .storage przy zatrzymaniu
+Home Assistanta i co SNAPSHOT_INTERVAL. Po restarcie bufory startują z tymi
+wartościami, oznaczonymi jako nieaktualne (stale) do pierwszego udanego
+odczytu bloku z PLC.
+"""
+import asyncio
+import datetime
+import logging
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from . import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "{}.process_image".format(DOMAIN)
+# Co ile zapisujemy migawkę w trakcie pracy (poza zapisem przy zatrzymaniu)
+SNAPSHOT_INTERVAL = datetime.timedelta(minutes=5)
+
+DATA_SNAPSHOT = "snapshot"
+
+
+async def async_get_snapshot(hass):
+    """Zwraca (lub tworzy i wczytuje) migawkę obrazów procesu."""
+    data = hass.data.setdefault(DOMAIN, {})
+    snapshot = data.get(DATA_SNAPSHOT)
+    if snapshot is None:
+        snapshot = ModbusSnapshot(hass)
+        data[DATA_SNAPSHOT] = snapshot
+    await snapshot.async_load()
+    return snapshot
+
+
+class ModbusSnapshot():
+    """Saves and restores the process images of all buffers."""
+
+    def __init__(self, hass):
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # nazwa bufora -> lista [start, wartości] z poprzedniego uruchomienia
+        self._saved = {}
+        # nazwa bufora -> bufor zapisywany w migawce
+        self._buffers = {}
+        self._load_task = None
+        self._cancel_interval = None
+
+    async def async_load(self):
+        """Wczytuje migawkę; równoległe wywołania czekają na jeden odczyt."""
+        if self._load_task is None:
+            self._load_task = self._hass.async_create_task(self._async_do_load())
+        await asyncio.shield(self._load_task)
+
+    async def _async_do_load(self):
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.error("Error loading process image snapshot: %s", e)
+            data = None
+        if data:
+            self._saved = data.get("buffers", {})
+        _LOGGER.debug("Loaded process image snapshot for buffers: %s", list(self._saved))
+
+        self._cancel_interval = async_track_time_interval(
+            self._hass, self._async_schedule_save, SNAPSHOT_INTERVAL)
+        self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_handle_stop)
+
+    @callback
+    def async_restore(self, buffer):
+        """Dołącza bufor do migawki i wpisuje do niego zapisane wartości."""
+        self._buffers[buffer.name] = buffer
+        saved = self._saved.get(buffer.name)
+        if saved:
+            restored = buffer.restore_snapshot(saved)
+            _LOGGER.debug("%s: restored %d blocks from snapshot", buffer.name, restored)
+
+    def _data_to_save(self):
+        buffers = dict(self._saved)
+        for name, buffer in self._buffers.items():
+            blocks = buffer.get_snapshot()
+            if blocks:
+                buffers[name] = blocks
+        return {"buffers": buffers}
+
+    async def async_save(self):
+        """Zapisuje bieżące obrazy procesu wszystkich buforów."""
+        try:
+            await self._store.async_save(self._data_to_save())
+        except Exception as e:
+            _LOGGER.error("Error saving process image snapshot: %s", e)
+
+    @callback
+    def _async_schedule_save(self, now=None):
+        self._hass.async_create_task(self.async_save())
+
+    async def _async_handle_stop(self, event):
+        if self._cancel_interval is not None:
+            self._cancel_interval()
+            self._cancel_interval = None
+        await self.async_save()
+        _LOGGER.debug("Process image snapshot saved on stop")
@@ -0,0 +1,4 @@
+"""Modbus HAS Switch integration."""
+from .switch import async_setup_platform
+
+__all__ = ["async_setup_platform"]
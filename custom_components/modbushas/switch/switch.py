@@ -0,0 +1,352 @@
+"""
+Support for Modbus switches.
+
+For more details about this platform, please refer to the documentation at
+https://home-assistant.io/components/switch.modbus/
+"""
+import logging
+import voluptuous as vol
+
+from homeassistant.core import callback
+
+from homeassistant.components.modbus.const import (
+    CALL_TYPE_REGISTER_HOLDING,
+    CALL_TYPE_REGISTER_INPUT,
+    DEFAULT_SLAVE,
+)
+
+from homeassistant.const import (
+    CONF_COMMAND_OFF,
+    CONF_COMMAND_ON,
+    CONF_NAME,
+    CONF_SCAN_INTERVAL,
+    CONF_SLAVE,
+    CONF_UNIQUE_ID,
+)
+
+from homeassistant.components.switch import SwitchEntity
+
+from homeassistant.helpers import config_validation as cv
+
+from ..buffer import (
+    ModbusCoilBuffer,
+    ModbusRegisterBuffer,
+    ModbusInputRegisterBuffer,
+    async_get_buffer,
+    scan_interval_to_timedelta,
+)
+from ..decoder import compile_decoder
+from ..entity import ModbusBufferEntity, async_add_buffer_entities
+
+_LOGGER = logging.getLogger(__name__)
+
+# Definiuję własne stałe, ponieważ nie są już dostępne w modbus.const
+CONF_COIL = "coil"
+CONF_COILS = "coils"
+CONF_REGISTER = "register"
+CONF_REGISTERS = "registers"
+CONF_REGISTER_TYPE = "register_type"
+CONF_STATE_OFF = "state_off"
+CONF_STATE_ON = "state_on"
+CONF_VERIFY_REGISTER = "verify_register"
+CONF_VERIFY_STATE = "verify_state"
+
+# Maksymalna dziura (w adresach) łączona w jeden odczyt blokowy
+CONF_MAX_GAP = "max_gap"
+# Okno (w sekundach), w którym zapisy łączone są w jedno zapytanie FC15 / FC16
+CONF_WRITE_WINDOW = "write_window"
+# Odpytywanie adaptacyjne: po zmianie lub poleceniu blok odpytywany jest co
+# min_scan_interval, a gdy milczy - coraz rzadziej, aż do scan_interval
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+
+COILS_SCHEMA = vol.Schema({
+    vol.Required(CONF_COIL): cv.positive_int,
+    vol.Required(CONF_NAME): cv.string,
+    vol.Optional(CONF_SCAN_INTERVAL): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Optional(CONF_SLAVE): cv.positive_int,
+    vol.Optional(CONF_UNIQUE_ID): cv.string
+})
+
+REGISTERS_SCHEMA = vol.Schema({
+    vol.Required(CONF_NAME): cv.string,
+    vol.Optional(CONF_SLAVE): cv.positive_int,
+    vol.Required(CONF_REGISTER): cv.positive_int,
+    vol.Required(CONF_COMMAND_ON): cv.positive_int,
+    vol.Required(CONF_COMMAND_OFF): cv.positive_int,
+    vol.Optional(CONF_VERIFY_STATE, default=True): cv.boolean,
+    vol.Optional(CONF_VERIFY_REGISTER): cv.positive_int,
+    vol.Optional(CONF_REGISTER_TYPE, default=CALL_TYPE_REGISTER_HOLDING):
+        vol.In([CALL_TYPE_REGISTER_HOLDING, CALL_TYPE_REGISTER_INPUT]),
+    vol.Optional(CONF_STATE_ON): cv.positive_int,
+    vol.Optional(CONF_STATE_OFF): cv.positive_int,
+    vol.Optional(CONF_SCAN_INTERVAL): vol.Any(cv.positive_int, cv.positive_float),
+    vol.Optional(CONF_UNIQUE_ID): cv.string
+})
+
+# Tworzę własny schemat zamiast importować z sensor
+PLATFORM_SCHEMA = vol.All(
+    cv.has_at_least_one_key(CONF_COILS, CONF_REGISTERS),
+    vol.Schema({
+        vol.Required("platform"): "modbushas",
+        vol.Optional("hub"): cv.string,
+        vol.Optional("scan_interval"): vol.Any(cv.positive_int, cv.positive_float),
+        vol.Optional(CONF_MAX_GAP): cv.positive_int,
+        vol.Optional(CONF_MIN_SCAN_INTERVAL): vol.Any(cv.positive_int, cv.positive_float),
+        vol.Optional(CONF_WRITE_WINDOW): vol.Any(cv.positive_int, cv.positive_float),
+        vol.Optional(CONF_COILS): [COILS_SCHEMA],
+        vol.Optional(CONF_REGISTERS): [REGISTERS_SCHEMA]
+    }))
+
+
+def _create_switches(hass, config):
+    """
+    Tworzy encje przełączników i zwraca (encje, bufory do primingu).
+
+    Przełączniki coilowe korzystają ze wspólnego bufora coili (tego samego co
+    światła i binary_sensor), rejestrowe - ze wspólnego bufora rejestrów
+    (tego samego co sensory), więc wszystkie stany przychodzą z blokowych
+    odczytów zakresów, a nie z odczytu na encję.
+    """
+    switches = []
+    buffers = []
+    scan_interval = config.get("scan_interval")
+    hub_name = config.get("hub", "fatek")
+    scan_interval_timedelta = scan_interval_to_timedelta(scan_interval)
+    options = {
+        "max_gap": config.get(CONF_MAX_GAP),
+        "min_interval": config.get(CONF_MIN_SCAN_INTERVAL),
+    }
+    # Okno zapisu należy do encji tej platformy, nie do wspólnego bufora
+    write_window = config.get(CONF_WRITE_WINDOW)
+
+    _LOGGER.debug("Switch scan interval: %s (type: %s), hub: %s", scan_interval, type(scan_interval), hub_name)
+
+    for coil in config.get(CONF_COILS, ()):
+        _LOGGER.debug("Adding coil switch: %s, coil: %s", coil.get(CONF_NAME), coil.get(CONF_COIL))
+        buffer = async_get_buffer(hass, ModbusCoilBuffer, hub_name,
+                                  coil.get(CONF_SLAVE, DEFAULT_SLAVE), scan_interval_timedelta, **options)
+        buffers.append(buffer)
+        switches.append(ModbusHASCoilSwitch(
+            coil.get(CONF_NAME),
+            coil.get(CONF_COIL),
+            buffer,
+            coil.get(CONF_UNIQUE_ID),
+            scan_interval_to_timedelta(coil.get(CONF_SCAN_INTERVAL, scan_interval)),
+            write_window))
+
+    for register in config.get(CONF_REGISTERS, ()):
+        _LOGGER.debug("Adding register switch: %s, register: %s", register.get(CONF_NAME), register.get(CONF_REGISTER))
+        slave = register.get(CONF_SLAVE, DEFAULT_SLAVE)
+        # Polecenia idą zawsze do rejestrów holding; stan może pochodzić z rejestru input
+        write_buffer = async_get_buffer(hass, ModbusRegisterBuffer, hub_name, slave,
+                                        scan_interval_timedelta, **options)
+        if register.get(CONF_REGISTER_TYPE) == CALL_TYPE_REGISTER_INPUT:
+            buffer = async_get_buffer(hass, ModbusInputRegisterBuffer, hub_name, slave,
+                                      scan_interval_timedelta, **options)
+        else:
+            buffer = write_buffer
+        buffers.append(buffer)
+        switches.append(ModbusHASRegisterSwitch(
+            register.get(CONF_NAME),
+            register.get(CONF_REGISTER),
+            register.get(CONF_COMMAND_ON),
+            register.get(CONF_COMMAND_OFF),
+            register.get(CONF_VERIFY_STATE),
+            register.get(CONF_VERIFY_REGISTER),
+            register.get(CONF_STATE_ON),
+            register.get(CONF_STATE_OFF),
+            buffer,
+            write_buffer,
+            register.get(CONF_UNIQUE_ID),
+            scan_interval_to_timedelta(register.get(CONF_SCAN_INTERVAL, scan_interval)),
+            write_window))
+
+    return switches, buffers
+
+
+async def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
+    """Setup Modbus switches."""
+    _LOGGER.info("Setting up Modbus Switch platform - config: %s", config)
+
+    # Użyj discovery_info jeśli config jest pusty
+    if not config and discovery_info:
+        config = discovery_info
+        _LOGGER.info("Using discovery_info as config")
+
+    switches, buffers = _create_switches(hass, config)
+    _LOGGER.info("Added %d Modbus switches", len(switches))
+    await async_add_buffer_entities(hass, async_add_devices, switches, buffers, "switch")
+
+
+class ModbusHASCoilSwitch(ModbusBufferEntity, SwitchEntity):
+    """Representation of a Modbus coil switch."""
+
+    def __init__(self, name, coil, buffer, unique_id=None, scan_interval=None, write_window=None):
+        """Initialize the coil switch."""
+        self._name = name
+        self._coil = int(coil)
+        self._buffer = buffer
+        self._write_window = write_window
+        self._buffer_addresses = (self._coil,)
+
+        # Generujemy unikalny ID dla encji - używamy podany lub generujemy domyślny
+        if unique_id:
+            self._attr_unique_id = unique_id
+        else:
+            self._attr_unique_id = f"modbushas_switch_{name}_{coil}"
+
+        # Własny scan_interval encji - blok coila odpytywany jest z najkrótszym
+        buffer.set_coil(self._coil, scan_interval)
+        _LOGGER.debug("ModbusHASCoilSwitch initialized: name=%s, coil=%s, unique_id=%s", name, coil, self._attr_unique_id)
+
+    def _state_from_buffer(self):
+        """Return the coil state from the process image."""
+        return self._buffer.get_cached_coil_state(self._coil)
+
+    @property
+    def name(self):
+        """Return the name of the switch."""
+        return self._name
+
+    @property
+    def is_on(self):
+        """Return true if switch is on."""
+        return self._state
+
+    async def async_turn_on(self, **kwargs):
+        """Turn the switch on."""
+        await self._async_write(True)
+
+    async def async_turn_off(self, **kwargs):
+        """Turn the switch off."""
+        await self._async_write(False)
+
+    async def _async_write(self, value):
+        _LOGGER.debug("Async writing switch %s: %s", self._name, value)
+        # Zapis trafia do wspólnego okna zapisu (FC15), weryfikacja - do zbiorczego odczytu bloku
+        if await self._buffer.async_write_coil(self._coil, value, verify_after_write=True,
+                                               on_verify_failed=self._handle_verify_failed,
+                                               write_window=self._write_window):
+            self._state = value
+            self.async_write_ha_state()
+            _LOGGER.debug("Switch %s set to %s", self._name, value)
+
+    @callback
+    def _handle_verify_failed(self, actual_state):
+        """Handle a write that the PLC did not confirm."""
+        _LOGGER.warning("Switch %s: PLC reports %s after write", self._name, actual_state)
+        if actual_state is not None:
+            self._state = actual_state
+            self.async_write_ha_state()
+
+    async def async_update(self):
+        """Async update the state of the switch."""
+        _LOGGER.debug("Async updating switch state: %s", self._name)
+
+        # Bufor zwraca wartość z obrazu procesu; blok starszy niż scan_interval
+        # jest najpierw odczytywany ponownie w całości
+        await self._buffer.async_read_coil(self._coil)
+        self._update_from_buffer()
+
+        _LOGGER.debug("Switch %s async updated state: %s (age %s s)", self._name, self._state, self.value_age)
+
+
+class ModbusHASRegisterSwitch(ModbusBufferEntity, SwitchEntity):
+    """Representation of a Modbus register switch."""
+
+    def __init__(self, name, register, command_on, command_off, verify_state, verify_register,
+                 state_on, state_off, buffer, write_buffer=None, unique_id=None, scan_interval=None,
+                 write_window=None):
+        """Initialize the register switch."""
+        self._name = name
+        self._register = int(register)
+        self._command_on = command_on
+        self._command_off = command_off
+        self._verify_state = verify_state
+        self._verify_register = int(verify_register) if verify_register is not None else self._register
+        self._state_on = state_on if state_on is not None else command_on
+        self._state_off = state_off if state_off is not None else command_off
+        # Bufor stanu (holding lub input) i bufor poleceń (zawsze holding)
+        self._buffer = buffer
+        self._write_buffer = write_buffer or buffer
+        self._write_window = write_window
+
+        if unique_id:
+            self._attr_unique_id = unique_id
+        else:
+            self._attr_unique_id = f"modbushas_switch_{name}_{register}"
+
+        # Stan odczytywany jest z bloku rejestrów, wspólnego z innymi encjami
+        self._decoder = None
+        if verify_state:
+            self._decoder = buffer.add_decoder(compile_decoder(self._verify_register), scan_interval)
+            self._buffer_addresses = (self._verify_register,)
+        _LOGGER.debug("ModbusHASRegisterSwitch initialized: name=%s, register=%s, verify_register=%s, unique_id=%s",
+                      name, register, self._verify_register, self._attr_unique_id)
+
+    @property
+    def assumed_state(self):
+        """Return True if the state is not read back from the PLC."""
+        return self._decoder is None
+
+    def _buffer_available(self):
+        """Return True if the state register (or the command buffer without it) is available."""
+        if self._decoder is None:
+            # Bez weryfikacji stan wynika tylko z wysłanych poleceń
+            return self._write_buffer.available
+        return super()._buffer_available()
+
+    def _state_from_buffer(self):
+        """Return the switch state decoded from the state register."""
+        if self._decoder is None:
+            return None
+        value = self._buffer.get_decoded_value(self._decoder)
+        if value is None:
+            return None
+        if value == self._state_on:
+            return True
+        if value == self._state_off:
+            return False
+        _LOGGER.warning("Switch %s: unexpected value %s in register %s", self._name, value, self._verify_register)
+        return None
+
+    @property
+    def name(self):
+        """Return the name of the switch."""
+        return self._name
+
+    @property
+    def is_on(self):
+        """Return true if switch is on."""
+        return self._state
+
+    async def async_turn_on(self, **kwargs):
+        """Turn the switch on."""
+        await self._async_command(self._command_on, True)
+
+    async def async_turn_off(self, **kwargs):
+        """Turn the switch off."""
+        await self._async_command(self._command_off, False)
+
+    async def _async_command(self, command, state):
+        _LOGGER.debug("Async writing switch %s: register %s = %s", self._name, self._register, command)
+        if not await self._write_buffer.async_write_registers(self._register, [command],
+                                                              write_window=self._write_window):
+            _LOGGER.warning("Switch %s: command %s to register %s not confirmed", self._name, command, self._register)
+            return
+        if self._decoder is None:
+            self._state = state
+            self.async_write_ha_state()
+            return
+        # Stan po poleceniu przychodzi ze zbiorczego odczytu bloku (sterownik może
+        # odpowiedzieć innym stanem niż polecenie) - encja dostanie go przez słuchacza
+        self._buffer.async_request_verify(self._verify_register)
+
+    async def async_update(self):
+        """Async update the state of the switch."""
+        _LOGGER.debug("Async updating switch state: %s", self._name)
+        if self._decoder is not None:
+            await self._buffer.async_read_register(self._verify_register, 1)
+        self._update_from_buffer()
+
+        _LOGGER.debug("Switch %s async updated state: %s (age %s s)", self._name, self._state, self.value_age)
@@ -0,0 +1,115 @@
+"""Fixtures for the Modbus HAS tests: a fake Home Assistant core and a fake PLC hub."""
+import asyncio
+
+import pytest
+
+from homeassistant.components.modbus.const import (
+    MODBUS_DOMAIN,
+    CALL_TYPE_COIL,
+    CALL_TYPE_REGISTER_HOLDING,
+    CALL_TYPE_REGISTER_INPUT,
+    CALL_TYPE_WRITE_COIL,
+    CALL_TYPE_WRITE_COILS,
+    CALL_TYPE_WRITE_REGISTER,
+    CALL_TYPE_WRITE_REGISTERS,
+)
+
+from custom_components.modbushas import buffer, coordinator
+
+HUB_NAME = "hub"
+
+
+class FakeResult():
+    """Response of the fake hub (bits for coils, registers for registers)."""
+
+    def __init__(self, bits=None, registers=None):
+        self.bits = bits
+        self.registers = registers
+
+
+class FakeHub():
+    """PLC image in memory; records every request as (call type, address, value)."""
+
+    def __init__(self):
+        self.coils = [False] * 1000
+        self.registers = [0] * 1000
+        self.calls = []
+        # Czas odpowiedzi PLC w sekundach
+        self.delay = 0
+        self.fail = False
+        # Adresy, których PLC nie zmienia mimo potwierdzonego zapisu
+        self.locked = set()
+
+    def count(self, *call_types):
+        """Return the number of requests of the given call types."""
+        return sum(1 for call in self.calls if call[0] in call_types)
+
+    async def async_pb_call(self, unit, address, value, use_call):
+        self.calls.append((use_call, address, value))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return None
+        if use_call == CALL_TYPE_COIL:
+            return FakeResult(bits=self.coils[address:address + value])
+        if use_call in (CALL_TYPE_REGISTER_HOLDING, CALL_TYPE_REGISTER_INPUT):
+            return FakeResult(registers=self.registers[address:address + value])
+        if use_call == CALL_TYPE_WRITE_COIL:
+            value = [value]
+        if use_call in (CALL_TYPE_WRITE_COIL, CALL_TYPE_WRITE_COILS):
+            for offset, bit in enumerate(value):
+                if address + offset not in self.locked:
+                    self.coils[address + offset] = bool(bit)
+            return FakeResult()
+        if use_call == CALL_TYPE_WRITE_REGISTER:
+            value = [value]
+        if use_call in (CALL_TYPE_WRITE_REGISTER, CALL_TYPE_WRITE_REGISTERS):
+            for offset, register in enumerate(value):
+                if address + offset not in self.locked:
+                    self.registers[address + offset] = register
+            return FakeResult()
+        return None
+
+
+class FakeBus():
+    """Event bus accepting listeners that never fire."""
+
+    def async_listen_once(self, event_type, listener):
+        return lambda: None
+
+
+class FakeHass():
+    """The part of Home Assistant used by the buffers and the coordinator."""
+
+    def __init__(self, hub):
+        self.data = {MODBUS_DOMAIN: {HUB_NAME: hub}}
+        self.bus = FakeBus()
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    def async_create_task(self, target, *args, **kwargs):
+        return self.loop.create_task(target)
+
+
+def _call_later(hass, delay, action):
+    """async_call_later na pętli asyncio (bez zegara Home Assistant)."""
+    seconds = delay.total_seconds() if hasattr(delay, "total_seconds") else delay
+    return asyncio.get_running_loop().call_later(seconds, action, None).cancel
+
+
+def _track_time_interval(hass, action, interval):
+    """Timery odpytywania nie startują - testy wywołują cykle same."""
+    return lambda: None
+
+
+@pytest.fixture
+def hub():
+    return FakeHub()
+
+
+@pytest.fixture
+def hass(hub, monkeypatch):
+    monkeypatch.setattr(buffer, "async_call_later", _call_later)
+    monkeypatch.setattr(coordinator, "async_track_time_interval", _track_time_interval)
+    return FakeHass(hub)
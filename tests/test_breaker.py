@@ -0,0 +1,115 @@
+"""Tests for the Modbus HAS circuit breaker."""
+import pytest
+
+from custom_components.modbushas.breaker import (
+    DEFAULT_FAILURE_THRESHOLD,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+def _breaker(**kwargs):
+    """Bezpiecznik bez rozrzutu - czasy oczekiwania są przewidywalne."""
+    kwargs.setdefault("jitter", 0)
+    return CircuitBreaker(**kwargs)
+
+
+def _trip(breaker, now=0):
+    for _ in range(DEFAULT_FAILURE_THRESHOLD):
+        breaker.record_failure("timeout", now)
+
+
+def test_stays_closed_below_threshold():
+    breaker = _breaker(failure_threshold=3)
+    breaker.record_failure("timeout", 0)
+    breaker.record_failure("timeout", 1)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow(1)
+
+
+def test_success_resets_failure_count():
+    breaker = _breaker(failure_threshold=3)
+    breaker.record_failure("timeout", 0)
+    breaker.record_failure("timeout", 1)
+    breaker.record_success(2)
+    breaker.record_failure("timeout", 3)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 1
+
+
+def test_opens_at_threshold_and_rejects_until_backoff():
+    breaker = _breaker(failure_threshold=3, backoff=2)
+    _trip(breaker, now=10)
+    assert breaker.state == STATE_OPEN
+    assert breaker.trips == 1
+    assert breaker.failing_since == 10
+    assert breaker.retry_at == 12
+    assert breaker.is_open(11)
+    assert not breaker.allow(11)
+    assert breaker.rejected == 1
+
+
+def test_half_open_after_backoff_lets_trial_request_through():
+    breaker = _breaker(backoff=2)
+    _trip(breaker, now=0)
+    assert breaker.allow(2)
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.is_open(2)
+
+
+def test_successful_trial_closes():
+    breaker = _breaker(backoff=2)
+    _trip(breaker, now=0)
+    breaker.allow(2)
+    breaker.record_success(2)
+    assert breaker.closed
+    assert breaker.failures == 0
+    assert breaker.failing_since is None
+    assert breaker.retry_at is None
+
+
+def test_failed_trial_doubles_backoff_up_to_max():
+    breaker = _breaker(backoff=2, max_backoff=10)
+    _trip(breaker, now=0)
+    now = 0
+    backoffs = []
+    for _ in range(4):
+        now = breaker.retry_at
+        assert breaker.allow(now)
+        breaker.record_failure("timeout", now)
+        assert breaker.state == STATE_OPEN
+        backoffs.append(breaker.retry_at - now)
+    assert backoffs == [4, 8, 10, 10]
+    assert breaker.trips == 1
+
+
+def test_backoff_restarts_after_recovery():
+    breaker = _breaker(backoff=2)
+    _trip(breaker, now=0)
+    breaker.allow(2)
+    breaker.record_failure("timeout", 2)
+    breaker.allow(breaker.retry_at)
+    breaker.record_success(breaker.retry_at)
+    _trip(breaker, now=100)
+    assert breaker.retry_at == 102
+    assert breaker.trips == 2
+
+
+def test_jitter_spreads_retry_time():
+    breaker = CircuitBreaker(backoff=10, jitter=0.2)
+    delays = set()
+    for _ in range(20):
+        _trip(breaker, now=0)
+        delays.add(breaker.retry_at)
+        assert 8 <= breaker.retry_at <= 12
+        breaker.record_success(0)
+    assert len(delays) > 1
+
+
+@pytest.mark.parametrize("state", [STATE_CLOSED, STATE_HALF_OPEN])
+def test_allow_passes_when_not_open(state):
+    breaker = _breaker()
+    breaker.state = state
+    assert breaker.allow(0)
@@ -0,0 +1,195 @@
+"""Tests for the Modbus HAS buffers."""
+import asyncio
+import datetime
+from array import array
+
+from homeassistant.components.modbus.const import (
+    CALL_TYPE_COIL,
+    CALL_TYPE_REGISTER_HOLDING,
+    CALL_TYPE_WRITE_COILS,
+    CALL_TYPE_WRITE_REGISTER,
+    CALL_TYPE_WRITE_REGISTERS,
+)
+
+from custom_components.modbushas.buffer import (
+    DEFAULT_VERIFY_DELAY,
+    ModbusCoilBuffer,
+    ModbusRegisterBuffer,
+    changed_offsets,
+)
+from custom_components.modbushas.decoder import compile_decoder
+
+from .conftest import HUB_NAME
+
+
+def test_changed_offsets_identical_images():
+    assert changed_offsets(bytes([1, 0, 1]), bytes([1, 0, 1])) == []
+
+
+def test_changed_offsets_coils():
+    old = bytes([0, 1, 0, 0, 1, 0, 0, 0, 0, 1])
+    new = bytes([1, 1, 0, 0, 0, 0, 0, 0, 0, 0])
+    assert changed_offsets(old, new) == [0, 4, 9]
+
+
+def test_changed_offsets_last_element_only():
+    old = bytes(300)
+    new = bytes(299) + b"\x01"
+    assert changed_offsets(old, new) == [299]
+
+
+def test_changed_offsets_registers():
+    old = array("H", [0, 0x0100, 5, 0xFFFF, 7])
+    new = array("H", [0, 0x0101, 5, 0x7FFF, 8])
+    assert changed_offsets(old.tobytes(), new.tobytes(), 2) == [1, 3, 4]
+
+
+def test_changed_offsets_register_high_and_low_byte_count_once():
+    old = array("H", [0x0000, 0x0000])
+    new = array("H", [0xFFFF, 0x0000])
+    assert changed_offsets(old.tobytes(), new.tobytes(), 2) == [0]
+
+
+def test_changed_offsets_matches_naive_comparison():
+    old = array("H", range(0, 500, 5))
+    new = array("H", old)
+    for offset in (0, 3, 4, 50, 98, 99):
+        new[offset] ^= 1 << (offset % 16)
+    expected = [offset for offset in range(len(old)) if old[offset] != new[offset]]
+    assert changed_offsets(old.tobytes(), new.tobytes(), 2) == expected
+
+
+def _intervals(buffer, *spans):
+    """Rejestruje zakresy (adres, liczba, interwał w sekundach) i zwraca plan bloków."""
+    for address, count, seconds in spans:
+        buffer.set_register(address, count, datetime.timedelta(seconds=seconds))
+    return [(block.start, block.count) for block in buffer.get_blocks()]
+
+
+def test_slower_block_bridges_single_faster_address(hass):
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, None)
+    blocks = _intervals(buffer, (0, 5, 5), (5, 1, 1), (6, 72, 5))
+    # Jedna dziura w adresie szybszego bloku jest tańsza niż dodatkowe zapytanie
+    assert blocks == [(0, 78), (5, 1)]
+    assert buffer.get_block(5).count == 1
+    assert buffer.get_block(0) is buffer.get_block(77)
+
+
+def test_slower_block_does_not_bridge_gap_over_max_gap(hass):
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, None, max_gap=4)
+    blocks = _intervals(buffer, (0, 1, 5), (1, 10, 1), (11, 1, 5))
+    assert blocks == [(0, 1), (1, 10), (11, 1)]
+
+
+def test_slower_span_inside_faster_block_is_read_with_it(hass):
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, None)
+    blocks = _intervals(buffer, (10, 1, 1), (14, 1, 1), (12, 1, 5))
+    assert blocks == [(10, 5)]
+    assert buffer.get_block(12) is buffer.get_block(10)
+
+
+def test_partial_overlap_keeps_addresses_of_faster_block(hass):
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, None)
+    fast = buffer.add_decoder(compile_decoder(10, 2, data_type="uint32"), datetime.timedelta(seconds=1))
+    slow = buffer.add_decoder(compile_decoder(11, 2, data_type="uint32"), datetime.timedelta(seconds=5))
+    blocks = buffer.get_blocks()
+    assert [(block.start, block.count) for block in blocks] == [(10, 2), (11, 2)]
+    fast_block = buffer.get_block(10)
+    assert buffer.get_block(11) is fast_block
+    assert buffer.get_block(12).start == 11
+    # Dekoder wartości wystającej poza szybszy blok czyta ją w całości z wolniejszego
+    assert fast in fast_block.decoders
+    assert slow in buffer.get_block(12).decoders
+    assert buffer.get_value_block(11, 2) is buffer.get_block(12)
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_reads_of_one_block_share_one_request(hass, hub):
+    hub.registers[10:13] = [1, 2, 3]
+    hub.delay = 0.01
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, datetime.timedelta(seconds=30))
+    buffer.set_register(10, 1)
+    buffer.set_register(12, 1)
+
+    async def read():
+        return await asyncio.gather(buffer.async_read_register(10, 1), buffer.async_read_register(12, 1),
+                                    buffer.async_refresh())
+
+    first, second, refreshed = _run(read())
+    assert (first, second, refreshed) == ([1], [3], True)
+    assert hub.count(CALL_TYPE_REGISTER_HOLDING) == 1
+    assert buffer.get_performance_stats()["coalesced_reads"] == 2
+
+
+def test_fresh_block_is_not_read_again(hass, hub):
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, datetime.timedelta(seconds=30))
+    buffer.set_register(10, 1)
+
+    async def read():
+        await buffer.async_read_register(10, 1)
+        await buffer.async_read_register(10, 1)
+
+    _run(read())
+    assert hub.count(CALL_TYPE_REGISTER_HOLDING) == 1
+
+
+def test_coil_writes_in_one_window_are_sent_as_one_fc15(hass, hub):
+    buffer = ModbusCoilBuffer("test", hass, HUB_NAME, 1, None)
+
+    async def write():
+        return await asyncio.gather(*(buffer.async_write_coil(coil, True, verify_after_write=False)
+                                      for coil in (3, 4, 5)))
+
+    assert _run(write()) == [True, True, True]
+    assert hub.calls == [(CALL_TYPE_WRITE_COILS, 3, [True, True, True])]
+
+
+def test_register_writes_are_grouped_into_contiguous_runs(hass, hub):
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, None)
+
+    async def write():
+        return await asyncio.gather(buffer.async_write_registers(100, [1, 2]),
+                                    buffer.async_write_registers(102, [3]),
+                                    buffer.async_write_registers(200, [9]))
+
+    assert _run(write()) == [True, True, True]
+    assert sorted(hub.calls) == [(CALL_TYPE_WRITE_REGISTER, 200, 9),
+                                 (CALL_TYPE_WRITE_REGISTERS, 100, [1, 2, 3])]
+
+
+def test_failed_write_is_reported_to_every_waiter(hass, hub):
+    hub.fail = True
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, None)
+
+    async def write():
+        return await asyncio.gather(buffer.async_write_registers(100, [1]),
+                                    buffer.async_write_registers(101, [2]))
+
+    assert _run(write()) == [False, False]
+    assert hub.count(CALL_TYPE_WRITE_REGISTERS) == 1
+
+
+def test_coil_writes_are_verified_with_one_block_read(hass, hub):
+    hub.locked.add(5)
+    buffer = ModbusCoilBuffer("test", hass, HUB_NAME, 1, datetime.timedelta(seconds=30))
+    for coil in (3, 4, 5):
+        buffer.set_coil(coil)
+    failed = []
+
+    async def write():
+        results = await asyncio.gather(*(
+            buffer.async_write_coil(coil, True, on_verify_failed=lambda actual, coil=coil: failed.append((coil, actual)))
+            for coil in (3, 4, 5)))
+        await asyncio.sleep(DEFAULT_VERIFY_DELAY * 2)
+        return results
+
+    assert _run(write()) == [True, True, True]
+    assert hub.count(CALL_TYPE_WRITE_COILS) == 1
+    assert hub.count(CALL_TYPE_COIL) == 1
+    # PLC nie przyjął coila 5 - obraz procesu i encja dostają stan rzeczywisty
+    assert failed == [(5, False)]
+    assert buffer.get_cached_coil_state(5) is False
+    assert buffer.get_cached_coil_state(4) is True
@@ -0,0 +1,101 @@
+"""Tests for the Modbus HAS hub coordinator."""
+import asyncio
+import datetime
+
+from homeassistant.components.modbus.const import CALL_TYPE_REGISTER_HOLDING
+
+from custom_components.modbushas.buffer import ModbusRegisterBuffer
+from custom_components.modbushas.coordinator import (
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    PRIORITY_REFRESH,
+    async_get_coordinator,
+)
+from custom_components.modbushas.sensor.sensor import ModbusHASHubSensor
+
+from .conftest import HUB_NAME
+
+
+def test_requests_are_sent_most_urgent_first(hass, hub):
+    coordinator = async_get_coordinator(hass, HUB_NAME)
+    order = []
+
+    def call(name):
+        async def request():
+            order.append(name)
+            return True
+        return request
+
+    async def run():
+        # Kolejka rusza dopiero po oddaniu pętli - wszystkie zapytania są już w kopcu
+        return await asyncio.gather(coordinator.async_call(PRIORITY_POLL, call("poll")),
+                                    coordinator.async_call(PRIORITY_REFRESH, call("refresh")),
+                                    coordinator.async_call(PRIORITY_COMMAND, call("command")))
+
+    assert asyncio.run(run()) == [True, True, True]
+    assert order == ["command", "refresh", "poll"]
+
+
+def test_joining_read_promotes_queued_request(hass, hub):
+    coordinator = async_get_coordinator(hass, HUB_NAME)
+    order = []
+
+    def call(name):
+        async def request():
+            order.append(name)
+            return True
+        return request
+
+    async def run():
+        poll = coordinator.async_queue_request(PRIORITY_POLL, call("poll"))
+        refresh = coordinator.async_queue_request(PRIORITY_REFRESH, call("refresh"))
+        coordinator.async_promote(poll, PRIORITY_COMMAND)
+        await asyncio.gather(poll.future, refresh.future)
+
+    asyncio.run(run())
+    assert order == ["poll", "refresh"]
+
+
+def test_overrunning_poll_cycle_skips_tick(hass, hub):
+    interval = datetime.timedelta(seconds=1)
+    hub.delay = 0.05
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, interval)
+    buffer.set_register(10, 1)
+    coordinator = async_get_coordinator(hass, HUB_NAME)
+
+    async def run():
+        buffer.async_add_listener(lambda: None)
+        coordinator._async_schedule_poll(interval)
+        # Drugi takt w trakcie trwającego cyklu nie uruchamia kolejnego
+        coordinator._async_schedule_poll(interval)
+        await coordinator._cycles[interval]
+
+    asyncio.run(run())
+    assert hub.count(CALL_TYPE_REGISTER_HOLDING) == 1
+    stats = coordinator.get_poll_stats()["1s"]
+    assert stats["cycles"] == 1
+    assert stats["overruns"] == 1
+
+
+def test_hub_sensor_exposes_queue_and_poll_stats(hass, hub):
+    interval = datetime.timedelta(seconds=1)
+    hub.delay = 0.05
+    buffer = ModbusRegisterBuffer("test", hass, HUB_NAME, 1, interval)
+    buffer.set_register(10, 1)
+    coordinator = async_get_coordinator(hass, HUB_NAME)
+    sensor = ModbusHASHubSensor(HUB_NAME, coordinator)
+
+    async def run():
+        buffer.async_add_listener(lambda: None)
+        coordinator._async_schedule_poll(interval)
+        coordinator._async_schedule_poll(interval)
+        await coordinator._cycles[interval]
+        await sensor.async_update()
+
+    asyncio.run(run())
+    assert sensor.native_value == 0
+    attributes = sensor.extra_state_attributes
+    assert attributes["poll_1s_cycles"] == 1
+    assert attributes["poll_1s_overruns"] == 1
+    assert attributes["poll_requests"] == 1
+    assert attributes["breaker_state"] == coordinator.get_queue_stats()["breaker_state"]
@@ -0,0 +1,120 @@
+"""Tests for the Modbus HAS register decoders."""
+import pytest
+
+from custom_components.modbushas.decoder import (
+    BYTE_ORDER_BIG,
+    BYTE_ORDER_LITTLE,
+    DATA_TYPE_BITFIELD,
+    DATA_TYPE_FLOAT,
+    DATA_TYPE_INT,
+    DATA_TYPE_STRING,
+    WORD_ORDER_BIG,
+    WORD_ORDER_LITTLE,
+    compile_decoder,
+)
+
+ORDERS = [
+    (WORD_ORDER_BIG, BYTE_ORDER_BIG),
+    (WORD_ORDER_BIG, BYTE_ORDER_LITTLE),
+    (WORD_ORDER_LITTLE, BYTE_ORDER_BIG),
+    (WORD_ORDER_LITTLE, BYTE_ORDER_LITTLE),
+]
+
+INTEGER_VALUES = [
+    ("int16", -12345),
+    ("uint16", 54321),
+    ("int32", -123456789),
+    ("uint32", 3456789012),
+    ("int64", -1234567890123456789),
+    ("uint64", 12345678901234567890),
+]
+
+
+@pytest.mark.parametrize("word_order,byte_order", ORDERS)
+@pytest.mark.parametrize("data_type,value", INTEGER_VALUES)
+def test_integer_round_trip(data_type, value, word_order, byte_order):
+    decoder = compile_decoder(100, data_type=data_type, word_order=word_order, byte_order=byte_order)
+    registers = decoder.encode(value)
+    assert len(registers) == decoder.count
+    assert decoder.decode_registers(registers) == value
+
+
+@pytest.mark.parametrize("word_order,byte_order", ORDERS)
+def test_scale_and_offset_round_trip(word_order, byte_order):
+    decoder = compile_decoder(0, data_type="int32", scale=0.1, offset=-40.0, precision=1,
+                              word_order=word_order, byte_order=byte_order)
+    assert decoder.decode_registers(decoder.encode(21.5)) == 21.5
+
+
+def test_word_order_of_32_bit_value():
+    value = 0x12345678
+    big = compile_decoder(0, data_type="uint32", word_order=WORD_ORDER_BIG)
+    little = compile_decoder(0, data_type="uint32", word_order=WORD_ORDER_LITTLE)
+    assert big.encode(value) == [0x1234, 0x5678]
+    assert little.encode(value) == [0x5678, 0x1234]
+
+
+def test_byte_order_of_16_bit_value():
+    swapped = compile_decoder(0, data_type="uint16", byte_order=BYTE_ORDER_LITTLE)
+    assert swapped.encode(0x1234) == [0x3412]
+    assert swapped.decode_registers([0x3412]) == 0x1234
+
+
+def test_legacy_count_and_signed():
+    decoder = compile_decoder(0, count=2, signed=True, word_order=WORD_ORDER_BIG)
+    assert decoder.decode_registers([0xFFFF, 0xFFFE]) == -2
+
+
+def test_legacy_three_registers_composed_from_words():
+    big = compile_decoder(0, count=3, word_order=WORD_ORDER_BIG)
+    little = compile_decoder(0, count=3, word_order=WORD_ORDER_LITTLE)
+    assert big.decode_registers([1, 2, 3]) == (1 << 32) | (2 << 16) | 3
+    assert little.decode_registers([3, 2, 1]) == (1 << 32) | (2 << 16) | 3
+
+
+@pytest.mark.parametrize("byte_order,registers", [
+    (BYTE_ORDER_BIG, [0x4142, 0x4300]),
+    (BYTE_ORDER_LITTLE, [0x4241, 0x0043]),
+])
+def test_string(byte_order, registers):
+    decoder = compile_decoder(0, count=2, data_type=DATA_TYPE_STRING, byte_order=byte_order)
+    assert decoder.decode_registers(registers) == "ABC"
+    with pytest.raises(ValueError):
+        decoder.encode("ABC")
+
+
+def test_bitfield():
+    decoder = compile_decoder(0, count=2, data_type=DATA_TYPE_BITFIELD, bit=14, bits=4,
+                              word_order=WORD_ORDER_BIG)
+    assert decoder.decode_registers([0x0002, 0xC000]) == 0b1011
+
+
+def test_sized_type_follows_count():
+    assert compile_decoder(0, count=2, data_type=DATA_TYPE_INT).count == 2
+    assert compile_decoder(0, count=4, data_type=DATA_TYPE_FLOAT).count == 4
+
+
+@pytest.mark.parametrize("data_type,count", [(DATA_TYPE_FLOAT, 3), (DATA_TYPE_BITFIELD, 3)])
+def test_unsupported_register_count(data_type, count):
+    with pytest.raises(ValueError):
+        compile_decoder(0, count=count, data_type=data_type)
+
+
+@pytest.mark.parametrize("word_order,byte_order", ORDERS)
+@pytest.mark.parametrize("data_type,value", [("float16", 21.5), ("float32", 21.375), ("float64", 1234.5678)])
+def test_float_round_trip_is_not_rounded(data_type, value, word_order, byte_order):
+    decoder = compile_decoder(100, data_type=data_type, word_order=word_order, byte_order=byte_order)
+    assert decoder.precision is None
+    assert decoder.decode_registers(decoder.encode(value)) == value
+
+
+def test_float_with_precision_is_rounded():
+    decoder = compile_decoder(0, data_type="float32", precision=1)
+    assert decoder.decode_registers(decoder.encode(21.375)) == 21.4
+
+
+def test_integer_without_precision_is_rounded_to_int():
+    decoder = compile_decoder(0, data_type="int16", scale=0.1)
+    assert decoder.precision == 0
+    assert decoder.decode_registers([215]) == 22
+    assert isinstance(decoder.decode_registers([215]), int)
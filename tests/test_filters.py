@@ -0,0 +1,132 @@
+"""Tests for the Modbus HAS publish filters."""
+import pytest
+
+from custom_components.modbushas.filters import (
+    AGGREGATE_LAST,
+    AGGREGATE_MAX,
+    AGGREGATE_MEAN,
+    AGGREGATE_MIN,
+    AggregateFilter,
+    DeadbandFilter,
+)
+
+
+def test_deadband_publishes_first_value():
+    deadband = DeadbandFilter(absolute=0.5)
+    assert deadband.accept(20.0, 0)
+    assert deadband.published == 20.0
+
+
+def test_deadband_suppresses_small_change():
+    deadband = DeadbandFilter(absolute=0.5)
+    deadband.accept(20.0, 0)
+    assert not deadband.accept(20.4, 1)
+    assert deadband.pending
+    assert deadband.suppressed == 1
+    assert deadband.published == 20.0
+
+
+def test_deadband_publishes_change_over_threshold():
+    deadband = DeadbandFilter(absolute=0.5)
+    deadband.accept(20.0, 0)
+    assert deadband.accept(20.6, 1)
+    assert not deadband.pending
+    assert deadband.published == 20.6
+
+
+def test_deadband_threshold_is_relative_to_last_published_value():
+    deadband = DeadbandFilter(absolute=0.5)
+    deadband.accept(20.0, 0)
+    # Pełzająca zmiana nie przesuwa punktu odniesienia
+    assert not deadband.accept(20.3, 1)
+    assert deadband.accept(20.6, 2)
+
+
+def test_deadband_percent():
+    deadband = DeadbandFilter(percent=10)
+    deadband.accept(200, 0)
+    assert not deadband.accept(219, 1)
+    assert deadband.accept(221, 2)
+
+
+def test_deadband_min_interval_holds_significant_change():
+    deadband = DeadbandFilter(absolute=0.5, min_interval=10)
+    deadband.accept(20.0, 0)
+    assert not deadband.accept(25.0, 5)
+    assert deadband.pending
+    assert deadband.accept(25.0, 10)
+
+
+def test_deadband_max_interval_publishes_small_change():
+    deadband = DeadbandFilter(absolute=0.5, max_interval=60)
+    deadband.accept(20.0, 0)
+    assert not deadband.accept(20.2, 30)
+    assert deadband.accept(20.2, 60)
+    assert deadband.published_at == 60
+
+
+def test_deadband_value_back_at_published_clears_pending():
+    deadband = DeadbandFilter(absolute=0.5)
+    deadband.accept(20.0, 0)
+    deadband.accept(20.2, 1)
+    assert not deadband.accept(20.0, 2)
+    assert not deadband.pending
+
+
+def test_deadband_none_and_non_numeric_values_are_published():
+    deadband = DeadbandFilter(absolute=0.5)
+    deadband.accept(20.0, 0)
+    assert deadband.accept(None, 1)
+    assert deadband.accept(20.1, 2)
+    assert deadband.accept("fault", 3)
+
+
+def _feed(aggregate_filter, samples, interval):
+    """Podaje próbki co `interval` sekund; zwraca opublikowane wartości."""
+    published = []
+    for index, value in enumerate(samples):
+        if aggregate_filter.accept(value, index * interval):
+            published.append(aggregate_filter.published)
+    return published
+
+
+@pytest.mark.parametrize("aggregate,expected", [
+    (AGGREGATE_MEAN, 3),
+    (AGGREGATE_MIN, 1),
+    (AGGREGATE_MAX, 6),
+    (AGGREGATE_LAST, 6),
+])
+def test_aggregate_publishes_first_sample_then_window_aggregate(aggregate, expected):
+    aggregate_filter = AggregateFilter(aggregate, 30)
+    # Okno 0-30 s: próbka z 30 s zamyka okno i wchodzi do agregatu, próbka z 40 s - do kolejnego
+    assert _feed(aggregate_filter, [1, 3, 2, 6, 7], 10) == [1, expected]
+
+
+def test_aggregate_precision():
+    aggregate_filter = AggregateFilter(AGGREGATE_MEAN, 20, precision=1)
+    assert _feed(aggregate_filter, [1, 1, 2], 10) == [1, 1.3]
+    aggregate_filter = AggregateFilter(AGGREGATE_MEAN, 20, precision=0)
+    assert _feed(aggregate_filter, [1, 1, 2], 10) == [1, 1]
+
+
+def test_aggregate_skips_non_numeric_samples():
+    aggregate_filter = AggregateFilter(AGGREGATE_MAX, 20)
+    assert _feed(aggregate_filter, [1, None, 5, None], 10) == [1, 5]
+
+
+def test_aggregate_window_sized_from_interval():
+    # 600 s okna co 1 s - domyślne 120 próbek obcięłoby okno
+    aggregate_filter = AggregateFilter(AGGREGATE_MAX, 600, interval=1)
+    samples = [0, 100] + [0] * 599
+    assert _feed(aggregate_filter, samples, 1) == [0, 100]
+
+
+def test_aggregate_rejects_samples_shorter_than_window():
+    with pytest.raises(ValueError):
+        AggregateFilter(AGGREGATE_MEAN, 600, samples=100, interval=1)
+
+
+def test_aggregate_feeds_next_filter():
+    aggregate_filter = AggregateFilter(AGGREGATE_MEAN, 20, next_filter=DeadbandFilter(absolute=1))
+    assert _feed(aggregate_filter, [10, 10, 10.4, 12, 12], 10) == [10, 12]
+    assert aggregate_filter.suppressed > 0
@@ -0,0 +1,75 @@
+"""Tests for the Modbus HAS read planner."""
+from custom_components.modbushas.planner import (
+    MAX_COILS_PER_READ,
+    MAX_REGISTERS_PER_READ,
+    MAX_REGISTERS_PER_WRITE,
+    group_contiguous,
+    merge_spans,
+    plan_blocks,
+)
+
+
+def test_merge_spans_overlapping_and_sorted():
+    assert merge_spans([(10, 2), (0, 1), (11, 3), (20, 1)]) == [[0, 0], [10, 13], [20, 20]]
+
+
+def test_merge_spans_keeps_adjacent_spans_apart():
+    assert merge_spans([(0, 2), (2, 2)]) == [[0, 1], [2, 3]]
+
+
+def test_merge_spans_zero_count_is_one_address():
+    assert merge_spans([(5, 0)]) == [[5, 5]]
+
+
+def test_plan_blocks_merges_gap_up_to_max_gap():
+    assert plan_blocks([(0, 1), (5, 1)], MAX_REGISTERS_PER_READ, 4) == [(0, 6)]
+
+
+def test_plan_blocks_splits_gap_over_max_gap():
+    assert plan_blocks([(0, 1), (6, 1)], MAX_REGISTERS_PER_READ, 4) == [(0, 1), (6, 1)]
+
+
+def test_plan_blocks_empty():
+    assert plan_blocks([], MAX_REGISTERS_PER_READ, 32) == []
+
+
+def test_plan_blocks_respects_register_limit():
+    spans = [(address, 1) for address in range(0, 200)]
+    blocks = plan_blocks(spans, MAX_REGISTERS_PER_READ, 32)
+    assert blocks == [(0, 125), (125, 75)]
+    assert all(count <= MAX_REGISTERS_PER_READ for _, count in blocks)
+
+
+def test_plan_blocks_respects_coil_limit():
+    spans = [(address, 1) for address in range(0, 4500, 3)]
+    blocks = plan_blocks(spans, MAX_COILS_PER_READ, 256)
+    assert all(count <= MAX_COILS_PER_READ for _, count in blocks)
+    assert blocks[0] == (0, 1999)
+    covered = {address for start, count in blocks for address in range(start, start + count)}
+    assert covered.issuperset(address for address, _ in spans)
+
+
+def test_plan_blocks_does_not_split_multi_register_value():
+    # 124-125 is one float32 - the block closes before it instead of cutting it
+    blocks = plan_blocks([(0, 1), (124, 2)], MAX_REGISTERS_PER_READ, 200)
+    assert blocks == [(0, 1), (124, 2)]
+
+
+def test_plan_blocks_splits_single_span_over_limit():
+    blocks = plan_blocks([(0, 1), (10, 300)], MAX_REGISTERS_PER_READ, 32)
+    assert blocks == [(0, 1), (10, 125), (135, 125), (260, 50)]
+
+
+def test_plan_blocks_merges_after_span_over_limit():
+    blocks = plan_blocks([(0, 130), (132, 1)], MAX_REGISTERS_PER_READ, 32)
+    assert blocks == [(0, 125), (125, 8)]
+
+
+def test_group_contiguous_runs():
+    assert group_contiguous([5, 1, 2, 3, 7, 6], MAX_REGISTERS_PER_WRITE) == [(1, [1, 2, 3]), (5, [5, 6, 7])]
+
+
+def test_group_contiguous_respects_write_limit():
+    runs = group_contiguous(range(130), MAX_REGISTERS_PER_WRITE)
+    assert [(start, len(members)) for start, members in runs] == [(0, 123), (123, 7)]
+